@@ -0,0 +1,205 @@
+"""다나와 대역 서버를 상대로 한 배치 다운로드 벤치마크
+
+benchmarks/standin_server.py 의 대역 서버를 띄우고 DanawaDownloader 의
+상품/이미지 주소를 그 서버로 바꿔서 배치 크기별로 전체 파이프라인을 돌린다.
+Chrome 없이 돌 수 있도록 상세 이미지는 HTTP 리졸버로만 찾는다.
+
+배치 크기마다 새 프로세스에서 실행해서 최대 메모리(RSS)가 서로 섞이지 않게
+하고, 다음 값을 출력한다.
+
+- 상품/분, 이미지/초, MB/초
+- 단계별 p50/p95 지연 (resolve: 상품 페이지 분석, download: 상품 하나의
+  이미지 전체, image: 이미지 한 장)
+- 최대 RSS
+- 시작 시간 (import: danawa_core 불러오기, init: 엔진 생성자)
+
+    python benchmarks/batch_bench.py --batch-sizes 1 10 50 --latency-ms 20
+    python benchmarks/batch_bench.py --error-rate 0.05 --detail-mode ajax --json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standin_server import DanawaStandin
+
+STAGES = ("resolve", "download", "image")
+
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB, resource 모듈이 없는 Windows 에서는 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KB, macOS 는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_batch(args):
+    """배치 하나를 실행하고 측정 결과를 dict 로 반환 (자식 프로세스에서 실행)"""
+    start = time.perf_counter()
+    from danawa_core import DanawaDownloader
+    import_seconds = time.perf_counter() - start
+
+    folder = tempfile.mkdtemp(prefix="danawa_bench_")
+    downloader = None
+    try:
+        start = time.perf_counter()
+        downloader = DanawaDownloader(
+            base_folder=folder,
+            max_workers=args.concurrency,
+            driver_pool_size=1,
+            transport=args.transport
+        )
+        startup = time.perf_counter() - start
+
+        downloader.log = lambda message: None
+        downloader.product_base_url = args.product_base_url
+        downloader.image_base_url = args.image_base_url
+        downloader.detail_resolvers = [('http', downloader.resolve_details_http)]
+        downloader.force_refresh = True
+        downloader.retry_base_delay = args.retry_delay
+        # 대역 서버 호스트에도 실제 호스트와 같은 동시 요청/초당 요청 제한 적용
+        for real, base_url in (('prod.danawa.com', args.product_base_url), ('img.danawa.com', args.image_base_url)):
+            host = urlparse(base_url).netloc
+            if args.no_host_limits:
+                downloader.host_limits[host] = args.concurrency
+                downloader.host_rates[host] = 1e9
+            else:
+                downloader.host_limits[host] = downloader.host_limits[real]
+                downloader.host_rates[host] = downloader.host_rates[real]
+
+        downloader.write_reports = False
+
+        pcodes = [str(args.first_pcode + i) for i in range(args.batch_size)]
+        start = time.perf_counter()
+        results = downloader.download(pcodes)
+        elapsed = time.perf_counter() - start
+
+        images = sum(len(result["downloaded"]) for result in results)
+        report = {
+            "batch_size": args.batch_size,
+            "seconds": elapsed,
+            "import_seconds": import_seconds,
+            "startup_seconds": startup,
+            "products": len(results),
+            "images": images,
+            "failed": sum(len(result["failed"]) for result in results),
+            "megabytes": downloader.downloaded_bytes / (1024 * 1024),
+            "products_per_min": len(results) / elapsed * 60 if elapsed else 0,
+            "images_per_sec": images / elapsed if elapsed else 0,
+            "peak_rss_mb": peak_rss_mb()
+        }
+        report["mb_per_sec"] = report["megabytes"] / elapsed if elapsed else 0
+        # 단계별 지연은 엔진의 BatchMetrics 집계를 그대로 사용
+        stages = downloader.metrics.summary()["stages"]
+        for stage in STAGES:
+            values = stages.get(stage)
+            report[stage] = {
+                "count": values["count"] if values else 0,
+                "p50_ms": values["p50"] * 1000 if values else None,
+                "p95_ms": values["p95"] * 1000 if values else None
+            }
+        report["stages"] = stages
+        report["counters"] = downloader.metrics.summary()["counters"]
+        return report
+    finally:
+        if downloader is not None:
+            downloader.close()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def format_ms(value):
+    return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+def print_table(reports):
+    header = f"{'batch':>5} {'ok':>6} {'fail':>5} {'sec':>7} {'prod/min':>9} {'img/s':>8} {'MB/s':>7} {'rss MB':>7} {'import ms':>9} {'init ms':>8}"
+    for stage in STAGES:
+        header += f" {stage + ' p50':>13} {stage + ' p95':>13}"
+    print(header)
+    for report in reports:
+        rss = f"{report['peak_rss_mb']:>7.1f}" if report['peak_rss_mb'] is not None else f"{'-':>7}"
+        line = (
+            f"{report['batch_size']:>5} {report['images']:>6} {report['failed']:>5} {report['seconds']:>7.2f}"
+            f" {report['products_per_min']:>9.1f} {report['images_per_sec']:>8.1f} {report['mb_per_sec']:>7.1f} {rss}"
+            f" {report['import_seconds'] * 1000:>9.1f} {report['startup_seconds'] * 1000:>8.1f}"
+        )
+        for stage in STAGES:
+            line += f"     {format_ms(report[stage]['p50_ms'])}     {format_ms(report[stage]['p95_ms'])}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다나와 대역 서버를 상대로 한 배치 다운로드 벤치마크")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50], help="측정할 배치 크기 (상품 수)")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="동시 다운로드 수")
+    parser.add_argument("--transport", choices=["requests", "httpx"], default="requests")
+    parser.add_argument("--no-host-limits", action="store_true", help="호스트별 동시 요청/초당 요청 제한 없이 측정")
+    parser.add_argument("--retry-delay", type=float, default=0.1, help="재시도 기본 대기 시간 (초)")
+    parser.add_argument("--thumbnails", type=int, default=5, help="상품별 썸네일 수")
+    parser.add_argument("--details", type=int, default=10, help="상품별 상세 이미지 수")
+    parser.add_argument("--image-size", type=int, default=100 * 1024, help="이미지 크기 (바이트)")
+    parser.add_argument("--latency-ms", type=float, default=10, help="이미지 응답 지연 (ms)")
+    parser.add_argument("--page-latency-ms", type=float, default=50, help="상품 페이지 응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--detail-mode", choices=["page", "ajax"], default="page", help="상세 이미지를 넣을 위치")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    # 자식 프로세스용 인자
+    parser.add_argument("--batch-size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--first-pcode", type=int, default=10000001, help=argparse.SUPPRESS)
+    parser.add_argument("--product-base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--image-base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.batch_size is not None:
+        print(json.dumps(run_batch(args)))
+        return
+
+    standin = DanawaStandin(
+        thumbnails=args.thumbnails,
+        details=args.details,
+        image_size=args.image_size,
+        latency_ms=args.latency_ms,
+        page_latency_ms=args.page_latency_ms,
+        error_rate=args.error_rate,
+        detail_mode=args.detail_mode
+    )
+    reports = []
+    with standin:
+        first_pcode = 10000001
+        for batch_size in args.batch_sizes:
+            command = [
+                sys.executable, os.path.abspath(__file__),
+                "--batch-size", str(batch_size),
+                "--first-pcode", str(first_pcode),
+                "--product-base-url", standin.product_base_url,
+                "--image-base-url", standin.image_base_url,
+                "--concurrency", str(args.concurrency),
+                "--transport", args.transport,
+                "--retry-delay", str(args.retry_delay)
+            ]
+            if args.no_host_limits:
+                command.append("--no-host-limits")
+            output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+            first_pcode += batch_size
+
+    if args.json:
+        print(json.dumps({"server": standin.request_counts, "batches": reports}, indent=2))
+    else:
+        print_table(reports)
+        print("server requests: " + ", ".join(f"{name}={count}" for name, count in sorted(standin.request_counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""상세 이미지 추출 방식별 속도 비교
+
+benchmarks/fixtures 의 샘플 페이지로 다음 방식을 비교한다.
+
+- legacy: 예전 방식 (BeautifulSoup html.parser 로 전체 파싱 + 선택자 6개)
+- html.parser / lxml / selectolax: danawa_extract.extract_image_sources
+
+모든 방식이 같은 이미지 목록을 돌려주는지도 함께 확인한다.
+
+    python benchmarks/extract_bench.py --repeat 50
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from danawa_extract import available_parsers, extract_image_sources
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+LEGACY_SELECTOR = '.detail_cont img, .detail_cont a img, .prod_detail img, .prod_detail a img, .detail_cont div img, .prod_detail div img'
+
+
+def legacy_extract(html, scoped=True):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    return [img.get('src', '') or img.get('data-src', '') for img in soup.select(LEGACY_SELECTOR if scoped else 'img')]
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="상세 이미지 추출 방식별 속도 비교")
+    parser.add_argument("--repeat", type=int, default=20, help="방식별 반복 횟수")
+    args = parser.parse_args(argv)
+
+    samples = [
+        ("product_page.html", True),
+        ("detail_fragment.html", False)
+    ]
+    print(f"{'fixture':<22} {'method':<12} {'images':>6} {'median ms':>10} {'speedup':>8}")
+    for name, scoped in samples:
+        with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+            html = f.read()
+
+        expected = legacy_extract(html, scoped)
+        baseline = measure(lambda: legacy_extract(html, scoped), args.repeat)
+        print(f"{name:<22} {'legacy':<12} {len(expected):>6} {baseline * 1000:>10.2f} {1.0:>8.1f}")
+        for method in reversed(available_parsers()):
+            sources = extract_image_sources(html, scoped=scoped, parser=method)
+            if sources != expected:
+                print(f"{name:<22} {method:<12} result differs from legacy ({len(sources)} vs {len(expected)} images)")
+                continue
+            elapsed = measure(lambda: extract_image_sources(html, scoped=scoped, parser=method), args.repeat)
+            print(f"{name:<22} {method:<12} {len(sources):>6} {elapsed * 1000:>10.2f} {baseline / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
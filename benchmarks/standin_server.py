@@ -0,0 +1,228 @@
+"""다나와 대역 서버
+
+prod.danawa.com 의 상품 페이지(/info/?pcode=)와 상세정보 엔드포인트,
+img.danawa.com 의 /prod_img/... 이미지 트리를 흉내 내는 로컬 HTTP 서버.
+상품 페이지 서버와 이미지 서버를 서로 다른 포트로 띄워서 호스트별
+동시 요청 제한도 실제와 같은 모양으로 동작하게 한다.
+
+썸네일/상세 이미지 수, 이미지 크기, 응답 지연, 오류 비율(503 + Retry-After)을
+조절할 수 있다. 단독으로 띄워서 GUI 나 CLI 를 연결할 수도 있다.
+
+    python benchmarks/standin_server.py --details 20 --latency-ms 30
+    python -m danawa_core 10000001 --product-base-url http://127.0.0.1:PORT --image-base-url http://127.0.0.1:PORT
+"""
+import os
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 클라이언트가 연결을 먼저 끊는 경우는 무시
+        pass
+
+
+class DanawaStandin:
+    """상품 페이지 서버와 이미지 서버 한 쌍
+
+    detail_mode 가 'page' 이면 상세 이미지를 상품 페이지에 넣고,
+    'ajax' 이면 상세정보 엔드포인트에서만 돌려준다 (더보기 버튼 흉내).
+    """
+
+    def __init__(self, thumbnails=5, details=10, image_size=100 * 1024, latency_ms=0,
+                 page_latency_ms=0, error_rate=0.0, detail_mode='page', seed=0):
+        self.thumbnails = thumbnails
+        self.details = details
+        self.image_size = image_size
+        self.latency_ms = latency_ms
+        self.page_latency_ms = page_latency_ms
+        self.error_rate = error_rate
+        self.detail_mode = detail_mode
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        # 모든 이미지가 공유하는 본문 (끝 16바이트만 경로별로 달라서 중복 제거에 걸리지 않음)
+        # 앞부분은 그대로이므로 실제 JPEG 으로 바꾸면 --derive 도 측정할 수 있다
+        self.body = os.urandom(max(image_size, 16))
+        self.request_counts = {}
+        self.count_lock = threading.Lock()
+        self.servers = []
+        self.product_base_url = None
+        self.image_base_url = None
+
+    def start(self):
+        product_server = self.serve(self.handle_product)
+        image_server = self.serve(self.handle_image)
+        self.product_base_url = f"http://127.0.0.1:{product_server.server_address[1]}"
+        self.image_base_url = f"http://127.0.0.1:{image_server.server_address[1]}"
+        return self
+
+    def stop(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def serve(self, handle):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        server = QuietServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return server
+
+    def count(self, name):
+        with self.count_lock:
+            self.request_counts[name] = self.request_counts.get(name, 0) + 1
+
+    def should_fail(self):
+        if not self.error_rate:
+            return False
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def image_path(self, pcode, folder, name):
+        return f"/prod_img/500000/{pcode[-3:]}/{pcode[-6:-3]}/{folder}/{name}.jpg"
+
+    def detail_html(self, pcode):
+        return "\n".join(
+            f'<p><img src="{self.image_base_url}{self.image_path(pcode, "add_1", f"{pcode}_detail_{i}")}" alt=""></p>'
+            for i in range(1, self.details + 1)
+        )
+
+    def product_html(self, pcode):
+        thumbnails = "\n".join(
+            f'<li><img src="{self.image_base_url}{self.image_path(pcode, "img", f"{pcode}_{i}")}?shrink=130:130"></li>'
+            for i in range(1, self.thumbnails + 1)
+        )
+        details = self.detail_html(pcode) if self.detail_mode == 'page' else ''
+        return (
+            f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>상품 {pcode}</title></head><body>"
+            f"<div class=\"thumb_area\"><ul>{thumbnails}</ul></div>"
+            f"<div class=\"detail_cont\"><div class=\"prod_detail\">{details}</div>"
+            f"<button class=\"btn_more\">상품정보 더보기</button></div>"
+            f"</body></html>"
+        )
+
+    def send_body(self, handler, status, body, content_type, headers=()):
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def send_error_response(self, handler):
+        self.count('error')
+        self.send_body(handler, 503, b"busy", "text/plain", [("Retry-After", "0")])
+
+    def handle_product(self, handler):
+        if self.page_latency_ms:
+            time.sleep(self.page_latency_ms / 1000)
+        url = urlparse(handler.path)
+        pcode = parse_qs(url.query).get("pcode", [""])[0]
+        if not pcode.isdigit():
+            self.count('not_found')
+            return self.send_body(handler, 404, b"not found", "text/plain")
+        if self.should_fail():
+            return self.send_error_response(handler)
+
+        if url.path == "/info/":
+            self.count('page')
+            html = self.product_html(pcode)
+        elif url.path == "/info/ajax/getProductDescription.ajax.php":
+            self.count('detail_content')
+            html = self.detail_html(pcode)
+        else:
+            self.count('not_found')
+            return self.send_body(handler, 404, b"not found", "text/plain")
+        self.send_body(handler, 200, html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def handle_image(self, handler):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        path = urlparse(handler.path).path
+        name = os.path.splitext(os.path.basename(path))[0]
+        folder = os.path.basename(os.path.dirname(path))
+        pcode, _, index = name.rpartition('_')
+        if folder == "img":
+            limit = self.thumbnails
+        elif folder == "add_1":
+            limit = self.details
+            pcode = pcode.rsplit('_', 1)[0]
+        else:
+            limit = 0
+        if not path.startswith("/prod_img/") or not pcode.isdigit() or not index.isdigit() or not 1 <= int(index) <= limit:
+            self.count('not_found')
+            return self.send_body(handler, 404, b"not found", "text/plain")
+        if self.should_fail():
+            return self.send_error_response(handler)
+
+        digest = hashlib.md5(path.encode("utf-8")).digest()
+        etag = f'"{digest.hex()}"'
+        if handler.headers.get("If-None-Match") == etag:
+            self.count('not_modified')
+            handler.send_response(304)
+            handler.send_header("ETag", etag)
+            handler.send_header("Content-Length", "0")
+            handler.end_headers()
+            return
+
+        body = self.body[:max(0, self.image_size - 16)] + digest
+        self.count('image')
+        self.send_body(handler, 200, body, "image/jpeg", [("ETag", etag)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다나와 대역 서버")
+    parser.add_argument("--thumbnails", type=int, default=5, help="상품별 썸네일 수")
+    parser.add_argument("--details", type=int, default=10, help="상품별 상세 이미지 수")
+    parser.add_argument("--image-size", type=int, default=100 * 1024, help="이미지 크기 (바이트)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="이미지 응답 지연 (ms)")
+    parser.add_argument("--page-latency-ms", type=float, default=0, help="상품 페이지 응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 응답 비율 (0~1)")
+    parser.add_argument("--detail-mode", choices=["page", "ajax"], default="page", help="상세 이미지를 넣을 위치")
+    args = parser.parse_args(argv)
+
+    standin = DanawaStandin(
+        thumbnails=args.thumbnails,
+        details=args.details,
+        image_size=args.image_size,
+        latency_ms=args.latency_ms,
+        page_latency_ms=args.page_latency_ms,
+        error_rate=args.error_rate,
+        detail_mode=args.detail_mode
+    ).start()
+    print(f"product base url: {standin.product_base_url}")
+    print(f"image base url:   {standin.image_base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
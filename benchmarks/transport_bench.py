@@ -0,0 +1,94 @@
+"""HTTP 전송 방식별 처리량 측정
+
+로컬에 이미지 서버를 띄우고 requests(연결 풀 크기 조절) / httpx(HTTP/2)
+세션으로 같은 수의 이미지를 동시에 받아 초당 요청 수를 비교한다.
+
+    python benchmarks/transport_bench.py --requests 2000 --workers 8
+
+로컬 서버는 평문 HTTP/1.1 이므로 httpx 도 HTTP/1.1 로 연결된다.
+HTTP/2 다중화 효과는 실제 img.danawa.com 같은 TLS 서버에서만 나타난다.
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from danawa_transport import create_session
+
+
+def start_image_server(image_size):
+    body = os.urandom(image_size)
+
+    class ImageHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_transport(transport, base_url, total, workers, pool_size):
+    session = create_session(transport, pool_size=pool_size)
+
+    def fetch(i):
+        with session.get(f"{base_url}/img/{i}.jpg", timeout=10, stream=True) as response:
+            for _ in response.iter_content(64 * 1024):
+                pass
+            return response.status_code == 200
+
+    try:
+        # 연결을 미리 맺어 두고 측정
+        list(ThreadPoolExecutor(workers).map(fetch, range(workers)))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            ok = sum(executor.map(fetch, range(total)))
+        elapsed = time.perf_counter() - start
+    finally:
+        session.close()
+    return ok, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP 전송 방식별 처리량 측정")
+    parser.add_argument("--requests", type=int, default=1000, help="전송 방식별 요청 수")
+    parser.add_argument("--workers", type=int, default=8, help="동시 요청 스레드 수")
+    parser.add_argument("--image-size", type=int, default=100 * 1024, help="이미지 크기 (바이트)")
+    parser.add_argument("--transports", nargs="+", default=["requests", "httpx"])
+    args = parser.parse_args(argv)
+
+    server = start_image_server(args.image_size)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"{'transport':<10} {'pool':>5} {'ok':>6} {'seconds':>8} {'req/s':>8}")
+    try:
+        for transport in args.transports:
+            # requests 는 기본 풀 크기(10)와 작업 수에 맞춘 풀 크기를 비교
+            pool_sizes = sorted({10, args.workers}) if transport == "requests" else [args.workers]
+            for pool_size in pool_sizes:
+                try:
+                    ok, elapsed = run_transport(transport, base_url, args.requests, args.workers, pool_size)
+                except ImportError as e:
+                    print(f"{transport:<10} skipped ({e})")
+                    break
+                print(f"{transport:<10} {pool_size:>5} {ok:>6} {elapsed:>8.2f} {ok / elapsed:>8.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
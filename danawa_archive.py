@@ -0,0 +1,284 @@
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import tarfile
+import zipfile
+import argparse
+import warnings
+import threading
+
+
+ARCHIVE_FORMATS = ('zip', 'tar', 'pack')
+
+
+class ZipSink:
+    """이미지를 ZIP 파일에 바로 추가하는 출력 (JPEG 은 이미 압축되어 있으므로 무압축 저장)"""
+
+    extension = ".zip"
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.archive = zipfile.ZipFile(path, "a", zipfile.ZIP_STORED, allowZip64=True)
+        self.names = set(self.archive.namelist())
+
+    def has(self, name):
+        with self.lock:
+            return name in self.names
+
+    def write(self, name, data):
+        self.write_stream(name, io.BytesIO(data), len(data))
+
+    def write_stream(self, name, fileobj, size, sha256=None):
+        """fileobj 의 size 바이트를 항목 하나로 기록 (청크 단위로 복사)"""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        info.file_size = size
+        with self.lock, warnings.catch_warnings():
+            # 같은 이름을 다시 쓰면 마지막 항목이 읽히므로 중복 경고는 무시
+            warnings.simplefilter("ignore")
+            with self.archive.open(info, "w") as f:
+                shutil.copyfileobj(fileobj, f)
+            self.names.add(name)
+
+    def read(self, name):
+        with self.lock:
+            return self.archive.read(name)
+
+    def copy(self, source, name):
+        self.write(name, self.read(source))
+
+    def close(self):
+        with self.lock:
+            self.archive.close()
+
+
+class TarSink:
+    """이미지를 tar 파일에 바로 추가하는 출력 (같은 이름은 마지막 항목이 유효)"""
+
+    extension = ".tar"
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.archive = tarfile.open(path, "a")
+        self.names = set(self.archive.getnames())
+
+    def has(self, name):
+        with self.lock:
+            return name in self.names
+
+    def write(self, name, data):
+        self.write_stream(name, io.BytesIO(data), len(data))
+
+    def write_stream(self, name, fileobj, size, sha256=None):
+        """fileobj 의 size 바이트를 항목 하나로 기록 (청크 단위로 복사)"""
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = time.time()
+        with self.lock:
+            self.archive.addfile(info, fileobj)
+            self.names.add(name)
+
+    def read(self, name):
+        with self.lock:
+            self.archive.fileobj.flush()
+            with tarfile.open(self.path, "r") as archive:
+                return archive.extractfile(archive.getmember(name)).read()
+
+    def copy(self, source, name):
+        self.write(name, self.read(source))
+
+    def close(self):
+        with self.lock:
+            self.archive.close()
+
+
+class PackSink:
+    """하나의 데이터 파일(.pack)에 이어 쓰고 색인(.pack.idx, JSON Lines)을 남기는 출력
+
+    데이터를 먼저 쓴 뒤 색인 한 줄을 추가하므로, 중간에 멈춰도 색인에
+    있는 항목은 항상 완전하다. 같은 내용은 새로 쓰지 않고 기존 위치를
+    가리키는 색인만 추가한다.
+    """
+
+    extension = ".pack"
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.lock = threading.Lock()
+        self.entries = read_pack_index(self.index_path)
+        self.by_hash = {entry['sha256']: entry for entry in self.entries.values() if entry.get('sha256')}
+        self.data = open(path, "ab")
+        self.index = open(self.index_path, "a", encoding="utf-8")
+
+    def has(self, name):
+        with self.lock:
+            return name in self.entries
+
+    def write(self, name, data, sha256=None):
+        self.write_stream(name, io.BytesIO(data), len(data), sha256)
+
+    def write_stream(self, name, fileobj, size, sha256=None):
+        """fileobj 의 size 바이트를 항목 하나로 기록 (같은 sha256 이 있으면 색인만 추가)"""
+        with self.lock:
+            known = self.by_hash.get(sha256) if sha256 else None
+            if known is None:
+                self.data.seek(0, os.SEEK_END)
+                offset = self.data.tell()
+                shutil.copyfileobj(fileobj, self.data)
+                self.data.flush()
+                entry = {'name': name, 'offset': offset, 'size': size, 'sha256': sha256}
+            else:
+                entry = dict(known, name=name)
+            self.add_entry(entry)
+
+    def add_entry(self, entry):
+        self.index.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.index.flush()
+        self.entries[entry['name']] = entry
+        if entry.get('sha256'):
+            self.by_hash.setdefault(entry['sha256'], entry)
+
+    def read(self, name):
+        with self.lock:
+            entry = self.entries[name]
+            self.data.flush()
+        with open(self.path, "rb") as f:
+            f.seek(entry['offset'])
+            return f.read(entry['size'])
+
+    def copy(self, source, name):
+        with self.lock:
+            self.add_entry(dict(self.entries[source], name=name))
+
+    def close(self):
+        with self.lock:
+            self.data.close()
+            self.index.close()
+
+
+SINKS = {
+    'zip': ZipSink,
+    'tar': TarSink,
+    'pack': PackSink
+}
+
+
+def open_sink(kind, path):
+    """출력 형식 이름으로 쓰기용 아카이브 열기 (path 에 확장자가 붙는다)"""
+    return SINKS[kind](path + open_sink_extension(kind))
+
+
+def open_sink_extension(kind):
+    return SINKS[kind].extension
+
+
+def read_pack_index(index_path):
+    """pack 색인 읽기 (같은 이름은 마지막 줄이 유효, 잘린 마지막 줄은 무시)"""
+    entries = {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['name']] = entry
+    except OSError:
+        pass
+    return entries
+
+
+class ArchiveReader:
+    """zip / tar / pack 출력 읽기
+
+        with ArchiveReader("danawa_images/75075386.zip") as archive:
+            for entry in archive.entries():
+                print(entry['name'], entry['size'])
+            archive.extract("out")
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if path.endswith(".zip"):
+            self.kind = 'zip'
+            self.archive = zipfile.ZipFile(path, "r")
+        elif path.endswith(".tar"):
+            self.kind = 'tar'
+            self.archive = tarfile.open(path, "r")
+        elif path.endswith(".pack"):
+            self.kind = 'pack'
+            self.archive = open(path, "rb")
+            self.index = read_pack_index(path + ".idx")
+        else:
+            raise ValueError(f"unknown archive type: {path}")
+
+    def entries(self):
+        """항목 목록 [{'name', 'size'}] (같은 이름이 여러 번 있으면 마지막 것만)"""
+        if self.kind == 'zip':
+            infos = {info.filename: info.file_size for info in self.archive.infolist()}
+        elif self.kind == 'tar':
+            infos = {info.name: info.size for info in self.archive.getmembers() if info.isfile()}
+        else:
+            infos = {name: entry['size'] for name, entry in self.index.items()}
+        return [{'name': name, 'size': size} for name, size in infos.items()]
+
+    def read(self, name):
+        if self.kind == 'zip':
+            return self.archive.read(name)
+        if self.kind == 'tar':
+            return self.archive.extractfile(self.archive.getmember(name)).read()
+        entry = self.index[name]
+        self.archive.seek(entry['offset'])
+        return self.archive.read(entry['size'])
+
+    def extract(self, folder, names=None):
+        """항목을 folder 아래에 파일로 풀고 만든 경로 목록을 반환"""
+        paths = []
+        root = os.path.abspath(folder)
+        for name in names if names is not None else [entry['name'] for entry in self.entries()]:
+            path = os.path.abspath(os.path.join(root, name))
+            # 아카이브 밖으로 나가는 경로(../)는 거부
+            if os.path.commonpath([root, path]) != root:
+                raise ValueError(f"unsafe entry name: {name}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(self.read(name))
+            paths.append(path)
+        return paths
+
+    def close(self):
+        self.archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다나와 이미지 아카이브(zip/tar/pack) 목록 보기와 풀기")
+    parser.add_argument("command", choices=["list", "extract"])
+    parser.add_argument("archive", help="아카이브 경로 (.zip, .tar, .pack)")
+    parser.add_argument("names", nargs="*", help="풀 항목 이름 (기본값: 전체)")
+    parser.add_argument("--out", "-o", default=".", help="풀 폴더 (기본값: 현재 폴더)")
+    args = parser.parse_args(argv)
+
+    with ArchiveReader(args.archive) as archive:
+        if args.command == "list":
+            for entry in archive.entries():
+                print(f"{entry['size']:>10}  {entry['name']}")
+        else:
+            for path in archive.extract(args.out, args.names or None):
+                print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1865 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import shutil
+import sqlite3
+import tempfile
+import random
+import hashlib
+import argparse
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs
+
+# requests, selenium, webdriver_manager, BeautifulSoup 같은 무거운 모듈은
+# 시작 시간을 줄이기 위해 실제로 쓰는 함수 안에서 불러온다
+from danawa_extract import DETAIL_IMAGE_SELECTOR, PAGE_READY_SCRIPT, extract_image_sources
+from danawa_metrics import BatchMetrics
+from danawa_archive import ARCHIVE_FORMATS, open_sink, open_sink_extension
+from danawa_transport import create_session
+
+class WebDriverPool:
+    """헤드리스 Chrome 드라이버를 재사용하기 위한 풀
+    
+    드라이버는 필요할 때 최대 size 개까지 한 번만 띄우고, 스크랩 작업에
+    빌려준 뒤 돌려받는다. max_pages 페이지를 처리했거나 오류가 난
+    드라이버는 종료하고 다음 요청 때 새로 띄운다.
+    """
+    
+    def __init__(self, create_driver, size=2, max_pages=50, log=print):
+        self.create_driver = create_driver
+        self.size = size
+        self.max_pages = max_pages
+        self.log = log
+        self.idle = queue.Queue()
+        self.page_counts = {}
+        self.live = 0
+        self.lock = threading.Lock()
+        self.closed = False
+        
+    def is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+            
+    def discard(self, driver):
+        with self.lock:
+            self.page_counts.pop(id(driver), None)
+            self.live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+            
+    def acquire(self):
+        while True:
+            if self.closed:
+                raise RuntimeError("WebDriver pool is closed")
+                
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = None
+                
+            if driver is None:
+                with self.lock:
+                    can_create = self.live < self.size
+                    if can_create:
+                        self.live += 1
+                if not can_create:
+                    # 모든 드라이버가 사용 중이면 반납될 때까지 대기
+                    try:
+                        driver = self.idle.get(timeout=1)
+                    except queue.Empty:
+                        continue
+                else:
+                    try:
+                        driver = self.create_driver()
+                    except Exception:
+                        with self.lock:
+                            self.live -= 1
+                        raise
+                    with self.lock:
+                        self.page_counts[id(driver)] = 0
+                    return driver
+                    
+            if self.is_healthy(driver):
+                return driver
+            self.log("Recycling unresponsive ChromeDriver")
+            self.discard(driver)
+            
+    def warm(self):
+        """드라이버를 미리 하나 띄워서 대기열에 넣어 둔다 (이미 있으면 아무 것도 하지 않음)"""
+        with self.lock:
+            if self.closed or self.live > 0:
+                return False
+            self.live += 1
+        try:
+            driver = self.create_driver()
+        except Exception:
+            with self.lock:
+                self.live -= 1
+            raise
+        # 드라이버를 띄우는 동안 풀이 닫혔으면 (창을 닫은 경우 등) 대기열에 넣지 않고 종료
+        with self.lock:
+            if not self.closed:
+                self.page_counts[id(driver)] = 0
+                self.idle.put(driver)
+                return True
+        self.discard(driver)
+        return False
+        
+    def release(self, driver, broken=False):
+        with self.lock:
+            pages = self.page_counts.get(id(driver), 0) + 1
+            self.page_counts[id(driver)] = pages
+            # close() 와 겹쳐도 닫힌 풀의 대기열에 남지 않도록 잠금 안에서 반납
+            keep = not (broken or self.closed or pages >= self.max_pages)
+            if keep:
+                self.idle.put(driver)
+        if not keep:
+            self.discard(driver)
+            
+    @contextmanager
+    def lease(self):
+        """with 블록 동안 드라이버를 하나 빌려준다"""
+        driver = self.acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception as e:
+            from selenium.common.exceptions import WebDriverException
+            broken = isinstance(e, WebDriverException)
+            raise
+        finally:
+            self.release(driver, broken)
+            
+    def close(self):
+        """대기 중인 드라이버를 모두 종료 (사용 중인 드라이버는 반납 시 종료)"""
+        with self.lock:
+            self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(driver)
+            
+
+# 이미지 크기 변형 (작은 것부터). original 은 원본이라 로컬에서 만들 수 없다
+VARIANT_WIDTHS = {
+    '500px': 500,
+    '890px': 890,
+    'original': None
+}
+
+
+def resize_image(source, target, width, quality=90):
+    """source 이미지를 가로 width 픽셀 이하로 줄여 target 에 저장 (프로세스 풀에서 실행)"""
+    from PIL import Image
+    
+    with Image.open(source) as image:
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        temp_path = target + ".part"
+        image.save(temp_path, format='JPEG', quality=quality)
+    os.replace(temp_path, target)
+    return target
+
+
+class HostBudget:
+    """호스트별 요청 예산
+    
+    토큰 버킷으로 초당 요청 수를, 활성 요청 수로 동시 요청 수를 제한하고 둘 다
+    AIMD 방식으로 조절한다. 429/5xx 응답을 받으면 동시 요청 한도와 초당 요청
+    수를 절반으로 줄이고 Retry-After 동안은 새 요청을 보내지 않는다. 요청이
+    연속으로 성공하면 동시 요청 한도는 1씩, 초당 요청 수는 상한의 10%씩
+    rate / max_concurrency 까지 다시 늘린다.
+    
+    slots 에 여러 프로세스가 공유하는 세마포어를 주면 프로세스 전체의
+    동시 요청 수도 그 크기를 넘지 않는다.
+    """
+    
+    def __init__(self, rate, max_concurrency, min_concurrency=1, slots=None, min_rate=0.5):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.active = 0
+        self.successes = 0
+        self.blocked_until = 0.0
+        self.slots = slots
+        self.condition = threading.Condition()
+        
+    def acquire(self):
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                wait = self.blocked_until - now
+                if wait <= 0 and self.active < self.limit:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.active += 1
+                        break
+                    wait = (1 - self.tokens) / self.rate
+                # 동시 요청 한도에 걸린 경우에는 release 가 깨워줄 때까지 대기
+                self.condition.wait(timeout=wait if wait > 0 else None)
+        # 다른 프로세스와 공유하는 슬롯은 잠금 밖에서 기다린다
+        if self.slots is not None:
+            self.slots.acquire()
+                
+    def release(self, throttled=False, retry_after=None):
+        if self.slots is not None:
+            self.slots.release()
+        with self.condition:
+            self.active -= 1
+            if throttled:
+                self.limit = max(self.min_concurrency, self.limit // 2)
+                self.set_rate(max(self.min_rate, self.rate / 2))
+                self.successes = 0
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            else:
+                self.successes += 1
+                if self.successes >= self.limit:
+                    self.successes = 0
+                    if self.limit < self.max_concurrency:
+                        self.limit += 1
+                    if self.rate < self.max_rate:
+                        self.set_rate(min(self.max_rate, self.rate + self.max_rate * 0.1))
+            self.condition.notify_all()
+            
+    def set_rate(self, rate):
+        # 줄어든 속도보다 큰 버스트가 나가지 않도록 버킷 크기도 맞춘다
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = min(self.tokens, self.capacity)
+            
+
+class TruncatedResponse(IOError):
+    """본문이 Content-Length 보다 짧게 끝난 응답 (다시 받으면 성공할 수 있음)"""
+    
+
+class RetryLater:
+    """나중에 다시 시도할 수 있는 다운로드 실패 (False 로 평가된다)"""
+    
+    def __init__(self, reason, retry_after=None):
+        self.reason = reason
+        self.retry_after = retry_after
+        
+    def __bool__(self):
+        return False
+        
+
+class ResolutionCache:
+    """pcode → 이미지 URL 목록을 저장하는 SQLite 캐시
+    
+    ttl 초가 지난 항목은 무효로 보고, 항목 수가 max_entries 를 넘으면
+    가장 오래 사용하지 않은 항목부터 지운다.
+    상세 이미지를 찾지 못한 결과는 negative_ttl 초 동안만 유효하다.
+    """
+    
+    def __init__(self, path, ttl=24 * 60 * 60, max_entries=5000, negative_ttl=60 * 60):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # 여러 프로세스가 같은 캐시를 쓸 때는 잠금이 풀릴 때까지 기다림
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS resolutions ("
+            "pcode TEXT PRIMARY KEY, images TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.commit()
+        
+    def get(self, pcode):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT images, created FROM resolutions WHERE pcode = ?", (pcode,)
+            ).fetchone()
+            if row is None:
+                return None
+            images = json.loads(row[0])
+            negative = not any(img.get('kind') == 'detail' for img in images)
+            if now - row[1] > (self.negative_ttl if negative else self.ttl):
+                self.conn.execute("DELETE FROM resolutions WHERE pcode = ?", (pcode,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE resolutions SET accessed = ? WHERE pcode = ?", (now, pcode))
+            self.conn.commit()
+        return images
+        
+    def put(self, pcode, images):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO resolutions (pcode, images, created, accessed) VALUES (?, ?, ?, ?)",
+                (pcode, json.dumps(images), now, now)
+            )
+            # LRU 제거
+            self.conn.execute(
+                "DELETE FROM resolutions WHERE pcode IN ("
+                "SELECT pcode FROM resolutions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+            
+    def close(self):
+        with self.lock:
+            self.conn.close()
+            
+
+class ProductManifest:
+    """상품 폴더별 다운로드 기록 (URL, 크기, 수정 시각, ETag/Last-Modified, 해시)"""
+    
+    def __init__(self, folder):
+        self.path = os.path.join(folder, "manifest.json")
+        self.lock = threading.Lock()
+        self.entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+            
+    def get(self, filename):
+        with self.lock:
+            return self.entries.get(filename)
+            
+    def set(self, filename, entry):
+        with self.lock:
+            self.entries[filename] = entry
+            
+    def save(self):
+        with self.lock:
+            temp_path = self.path + ".part"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self.path)
+            
+
+class BatchJournal:
+    """중단된 일괄 작업을 이어서 하기 위한 완료 기록 (JSON Lines)
+    
+    첫 줄에 입력 목록의 해시를 기록하고, 처리가 끝난 입력마다 한 줄씩
+    추가한다. 같은 목록으로 다시 시작하면 기록된 항목은 건너뛴다.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        
+    def start(self, urls):
+        """작업을 시작하고 이전 실행에서 완료된 입력 목록을 반환"""
+        batch_id = hashlib.sha1("\n".join(url.strip() for url in urls).encode("utf-8")).hexdigest()
+        done = set()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0].get('batch') == batch_id:
+                done = {line['done'] for line in lines[1:] if 'done' in line}
+        except (OSError, ValueError):
+            done = set()
+            
+        if not done:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({'batch': batch_id}) + "\n")
+        return done
+        
+    def mark_done(self, url):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({'done': url.strip()}, ensure_ascii=False) + "\n")
+                
+    def finish(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+            
+class DanawaDownloader:
+    """다나와 상품 이미지 수집/다운로드 엔진
+    
+    GUI 없이 라이브러리나 명령줄에서 사용할 수 있다. 로그와 진행 상황은
+    log / update_progress / set_status 를 통해 알리며, 화면이 있는
+    프론트엔드는 이 메서드들을 재정의해서 사용한다.
+    
+    Selenium은 정적 HTML로 상세 이미지를 찾지 못한 경우에만 불러온다.
+    """
+    
+    def __init__(self, base_folder="danawa_images", max_workers=8, driver_pool_size=2, transport="requests",
+                 cache_ttl=24 * 60 * 60, cache_max_entries=5000, negative_cache_ttl=60 * 60):
+        # 다운로드 폴더 생성
+        self.base_folder = base_folder
+        os.makedirs(self.base_folder, exist_ok=True)
+        
+        # 다나와 주소 (벤치마크에서는 로컬 대역 서버 주소로 바꿔서 사용)
+        self.product_base_url = "https://prod.danawa.com"
+        self.image_base_url = "https://img.danawa.com"
+        
+        # 동시 다운로드 설정 (전체 동시 작업 수 / 호스트별 최대 동시 요청 수 / 초당 요청 수)
+        self.max_workers = max_workers
+        self.host_limits = {
+            'img.danawa.com': 6,
+            'prod.danawa.com': 2
+        }
+        # 초당 요청 수는 상한값이다. 처음에는 상한으로 시작하고 429/5xx 를 받으면
+        # 절반으로 줄였다가 성공이 이어지면 다시 늘린다 (HostBudget 참고).
+        # 평상시에는 호스트별 동시 요청 수가 실제 부하를 제한한다.
+        self.host_rates = {
+            'img.danawa.com': 100.0,
+            'prod.danawa.com': 5.0
+        }
+        self.default_host_rate = 50.0
+        # 여러 프로세스로 나눠 실행할 때 호스트별 동시 요청 수를 공유하는 세마포어 (샤드 모드)
+        self.host_slots = {}
+        self.host_budgets = {}
+        self.host_lock = threading.Lock()
+        
+        # HTTP 세션 (처음 요청할 때 만들고 close() 때까지 유지, 연결 풀 크기는 동시 작업 수에 맞춤)
+        self.transport = transport
+        self.http_session = None
+        self.session_lock = threading.Lock()
+        
+        # 재시도 설정 (429/5xx/연결 오류는 배치가 끝난 뒤 지수 백오프로 다시 시도)
+        self.max_retries = 3
+        self.retry_base_delay = 1.0
+        self.retry_max_delay = 60.0
+        self.retry_queue = []
+        
+        # 이미지 종류별로 받을 크기 ('500px', '890px', 'original')
+        # derive_variants 를 켜면 가장 큰 크기만 받고 나머지는 Pillow로 만든다
+        self.variant_policy = {
+            'thumbnail': ['500px'],
+            'detail': ['original'],
+            'direct': ['500px', '890px']
+        }
+        self.derive_variants = False
+        self.resize_quality = 90
+        self.resize_pool = None
+        
+        # 썸네일 설정 (상품 페이지에서 갤러리를 찾지 못했을 때 가정할 수 / 최대 썸네일 수)
+        self.default_thumbnails = 5
+        self.max_thumbnails = 20
+        
+        # 증분 다운로드 설정 (기존 파일이 유효하면 건너뛰기 / 조건부 요청으로 재확인)
+        self.incremental = True
+        self.revalidate = False
+        
+        # 스트리밍 다운로드 설정 (청크 크기 / 이미지 한 장의 최대 크기, None이면 제한 없음)
+        self.chunk_size = 64 * 1024
+        self.max_image_bytes = 50 * 1024 * 1024
+        self.downloaded_bytes = 0
+        self.bytes_lock = threading.Lock()
+        
+        # 중복 제거 설정 (같은 내용의 이미지는 해시 저장소에 한 번만 저장하고 하드 링크)
+        self.dedup = True
+        self.blob_folder = os.path.join(self.base_folder, "blobs")
+        self.blob_lock = threading.Lock()
+        self.url_blobs = {}
+        
+        # 저장 방식 ('files': 상품 폴더에 파일로 저장, 'zip' / 'tar' / 'pack': 아카이브에 바로 기록)
+        # archive_scope 가 'product' 면 상품마다 <pcode>.zip, 'batch' 면 배치마다 하나의 아카이브
+        self.output = 'files'
+        self.archive_scope = 'product'
+        self.archive_name = None
+        self.current_archive_name = None
+        self.archive_sinks = {}
+        self.archive_lock = threading.Lock()
+        # 아카이브 항목 하나를 받는 동안 메모리에 둘 최대 크기 (넘으면 임시 파일 사용)
+        self.archive_spool_size = 1024 * 1024
+        
+        # 파이프라인 설정 (리졸브 단계가 앞서 나갈 수 있는 최대 상품 수)
+        self.pipeline_depth = 2
+        
+        # Selenium 웹드라이버 풀 (앱 종료 시까지 재사용)
+        self.driver_pool_size = driver_pool_size
+        self.driver_max_pages = 50
+        # chromedriver 경로는 chromedriver_cache_file 에 기록해 두고 chromedriver_cache_ttl 동안은
+        # 버전 확인(네트워크) 없이 재사용, 확인에 실패하면 오래된 기록이나 PATH 의 chromedriver 사용
+        self.chromedriver_path = None
+        self.chromedriver_cache_file = os.path.join(self.base_folder, "chromedriver.json")
+        self.chromedriver_cache_ttl = 7 * 24 * 60 * 60
+        self.chromedriver_lock = threading.Lock()
+        self.driver_pool = WebDriverPool(
+            self.create_driver,
+            size=self.driver_pool_size,
+            max_pages=self.driver_max_pages,
+            # main() 의 --json 이나 샤드 작업 프로세스가 나중에 log 를 바꿔도 따라가도록 호출 시점에 찾는다
+            log=lambda message: self.log(message)
+        )
+        self.resolve_workers = self.driver_pool_size
+        
+        # 상세 이미지 리졸버 체인 (앞에서부터 시도, 결과가 있으면 중단)
+        # 리졸버는 (pcode, 이미 받은 상품 페이지 HTML 또는 None) 을 받는다
+        # html_parser: 'auto' 면 selectolax → lxml → html.parser 중 설치된 것 사용
+        self.html_parser = 'auto'
+        # Selenium 페이지 준비 판단 (변화가 없어야 하는 시간 / 최대 대기 시간)
+        self.page_quiet_ms = 500
+        self.page_ready_timeout = 8.0
+        self.detail_content_path = "/info/ajax/getProductDescription.ajax.php?pcode={pcode}"
+        self.detail_resolvers = [
+            ('http', self.resolve_details_http),
+            ('selenium', self.resolve_details_selenium)
+        ]
+        self.resolver_counts = {}
+        self.resolver_lock = threading.Lock()
+        
+        # 상품별 이미지 URL 캐시 (반복 작업 시 페이지 분석 생략)
+        # 유효 시간과 최대 항목 수는 cache_ttl / cache_max_entries 로 언제든 바꿀 수 있다
+        # 상세 이미지를 찾지 못한 상품은 negative_cache_ttl 동안만 다시 분석하지 않는다
+        self.force_refresh = False
+        self.resolution_cache = ResolutionCache(
+            os.path.join(self.base_folder, "resolution_cache.sqlite3"),
+            ttl=cache_ttl,
+            max_entries=cache_max_entries,
+            negative_ttl=negative_cache_ttl
+        )
+        
+        # 단계별 소요 시간/카운터 (배치가 끝나면 reports 폴더에 JSON/CSV 보고서 저장)
+        # prometheus_textfile 을 지정하면 node_exporter textfile 형식으로도 내보낸다
+        self.metrics = BatchMetrics()
+        self.write_reports = True
+        self.report_folder = os.path.join(self.base_folder, "reports")
+        self.prometheus_textfile = None
+        
+        # 마지막으로 다운로드한 상품 폴더 경로
+        self.last_download_folder = None
+        
+        # 다운로드 진행 상태
+        self.total_images = 0
+        self.downloaded_images = 0
+        
+    def log(self, message):
+        print(message)
+        
+    def update_progress(self, current, total):
+        """진행 상황 알림 (프론트엔드에서 재정의)"""
+        pass
+        
+    def set_status(self, text, progress=None):
+        """상태 메시지 알림 (프론트엔드에서 재정의)"""
+        pass
+        
+    @property
+    def cache_ttl(self):
+        """이미지 URL 캐시 유효 시간 (초)"""
+        return self.resolution_cache.ttl
+        
+    @cache_ttl.setter
+    def cache_ttl(self, value):
+        self.resolution_cache.ttl = value
+        
+    @property
+    def negative_cache_ttl(self):
+        """상세 이미지를 찾지 못한 결과의 캐시 유효 시간 (초)"""
+        return self.resolution_cache.negative_ttl
+        
+    @negative_cache_ttl.setter
+    def negative_cache_ttl(self, value):
+        self.resolution_cache.negative_ttl = value
+        
+    @property
+    def cache_max_entries(self):
+        """이미지 URL 캐시 최대 항목 수 (넘으면 오래 쓰지 않은 항목부터 삭제)"""
+        return self.resolution_cache.max_entries
+        
+    @cache_max_entries.setter
+    def cache_max_entries(self, value):
+        self.resolution_cache.max_entries = value
+        
+    @property
+    def session(self):
+        """HTTP 세션 (처음 쓸 때 만들면서 requests/httpx 를 불러온다)"""
+        if self.http_session is None:
+            with self.session_lock:
+                if self.http_session is None:
+                    session = create_session(self.transport, pool_size=max(self.max_workers, max(self.host_limits.values())))
+                    session.headers.update({
+                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+                    })
+                    self.http_session = session
+        return self.http_session
+        
+    def resolve_chromedriver(self, refresh=False):
+        """chromedriver 실행 파일 경로 찾기
+        
+        최근에 찾은 경로가 기록되어 있으면 그대로 쓰고, 아니면 webdriver_manager 로
+        버전을 확인한다. 오프라인 등으로 확인에 실패하면 오래된 기록, PATH 의
+        chromedriver 순서로 찾고, 모두 없으면 None (Selenium Manager 에 맡김) 을 반환한다.
+        """
+        cached = None
+        try:
+            with open(self.chromedriver_cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if not os.path.isfile(cached.get('path', '')):
+                cached = None
+        except (OSError, ValueError, AttributeError):
+            cached = None
+            
+        if cached and not refresh and time.time() - cached.get('resolved', 0) < self.chromedriver_cache_ttl:
+            return cached['path']
+            
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+            self.log("ChromeDriver 버전 확인 중...")
+            path = ChromeDriverManager().install()
+        except Exception as e:
+            self.log(f"ChromeDriver 버전 확인 실패: {str(e)}")
+            if cached:
+                return cached['path']
+            return shutil.which("chromedriver")
+            
+        try:
+            with open(self.chromedriver_cache_file, "w", encoding="utf-8") as f:
+                json.dump({'path': path, 'resolved': time.time()}, f)
+        except OSError:
+            pass
+        return path
+        
+    def create_driver(self):
+        """헤드리스 Chrome 드라이버 생성 (드라이버 풀에서 호출)"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service as ChromeService
+        
+        start = time.perf_counter()
+        try:
+            with self.chromedriver_lock:
+                if self.chromedriver_path is None:
+                    self.chromedriver_path = self.resolve_chromedriver()
+                    
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-logging')
+            options.add_argument('--log-level=3')
+            options.add_argument('--silent')
+            options.add_argument('--disable-notifications')
+            options.add_argument('--disable-popup-blocking')
+            options.add_argument('--disable-infobars')
+            options.add_argument('--disable-web-security')
+            options.add_argument('--disable-features=IsolateOrigins,site-per-process')
+            # load 이벤트까지 기다리지 않고 DOM 준비 후 바로 반환 (이후 준비 상태는 스크립트로 확인)
+            options.page_load_strategy = 'eager'
+            
+            try:
+                driver = webdriver.Chrome(service=ChromeService(self.chromedriver_path), options=options)
+            except Exception as e:
+                # 기록된 드라이버가 Chrome 업데이트 등으로 맞지 않으면 한 번만 다시 찾기
+                self.log(f"ChromeDriver 시작 실패, 드라이버를 다시 찾습니다: {str(e)}")
+                with self.chromedriver_lock:
+                    self.chromedriver_path = self.resolve_chromedriver(refresh=True)
+                driver = webdriver.Chrome(service=ChromeService(self.chromedriver_path), options=options)
+            driver.set_page_load_timeout(30)
+            
+            self.log("ChromeDriver 초기화 완료")
+            return driver
+            
+        except Exception as e:
+            self.log(f"ChromeDriver 초기화 오류: {str(e)}")
+            raise
+        finally:
+            self.metrics.record('driver_start', time.perf_counter() - start)
+            
+    def get_host_budget(self, url):
+        """호스트별 요청 예산 반환"""
+        host = urlparse(url).netloc
+        with self.host_lock:
+            if host not in self.host_budgets:
+                self.host_budgets[host] = HostBudget(
+                    self.host_rates.get(host, self.default_host_rate),
+                    self.host_limits.get(host, self.max_workers),
+                    slots=self.host_slots.get(host)
+                )
+            return self.host_budgets[host]
+            
+    def is_throttled(self, status_code):
+        return status_code == 429 or 500 <= status_code < 600
+        
+    def get_retry_after(self, response):
+        """Retry-After 헤더를 초 단위로 변환 (초 또는 HTTP 날짜 형식)"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        from email.utils import parsedate_to_datetime
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+            
+    def backoff_delay(self, attempt, retry_after=None):
+        """지수 백오프 + 지터 (Retry-After 가 더 길면 그 값을 따름)"""
+        delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+        delay *= random.uniform(0.5, 1.5)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+        
+    def fetch(self, url, **kwargs):
+        """호스트 예산에 맞춰 페이지를 요청하고 429/5xx/연결 오류는 백오프 후 재시도"""
+        import requests
+        
+        kwargs.setdefault('timeout', 10)
+        budget = self.get_host_budget(url)
+        for attempt in range(1, self.max_retries + 2):
+            budget.acquire()
+            throttled = False
+            retry_after = None
+            self.metrics.count('requests')
+            try:
+                response = self.session.get(url, **kwargs)
+                throttled = self.is_throttled(response.status_code)
+                if throttled:
+                    retry_after = self.get_retry_after(response)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError):
+                throttled = True
+                if attempt > self.max_retries:
+                    raise
+                response = None
+            finally:
+                budget.release(throttled, retry_after)
+                if throttled:
+                    self.metrics.count('request_errors')
+                
+            if not throttled or attempt > self.max_retries:
+                return response
+            delay = self.backoff_delay(attempt, retry_after)
+            self.log(f"Retrying {url} in {delay:.1f}s")
+            time.sleep(delay)
+        return response
+        
+    def file_sha256(self, filepath):
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+        
+    def file_mtime(self, filepath):
+        return os.stat(filepath).st_mtime_ns
+        
+    def is_valid_file(self, filepath, entry):
+        """디스크의 파일이 매니페스트 기록과 일치하는지 확인
+        
+        크기와 수정 시각이 기록과 같으면 해시는 계산하지 않는다.
+        수정 시각이 다르거나 revalidate 가 켜져 있을 때만 해시를 비교한다.
+        """
+        try:
+            stat = os.stat(filepath)
+            if stat.st_size != entry.get('size'):
+                return False
+            if not self.revalidate and stat.st_mtime_ns == entry.get('mtime'):
+                return True
+            return self.file_sha256(filepath) == entry.get('sha256')
+        except OSError:
+            return False
+            
+    def stream_to_file(self, response, filepath):
+        """응답 본문을 청크 단위로 임시 파일에 쓴 뒤 교체하고 매니페스트 항목을 반환
+        
+        이미지 전체를 메모리에 올리지 않으며, 크기 제한을 넘거나 본문이
+        Content-Length 보다 짧으면 임시 파일을 지우고 예외를 발생시킨다.
+        """
+        # 임시 파일에 쓴 뒤 교체해서 중단되어도 깨진 파일이 남지 않게 함
+        temp_path = filepath + ".part"
+        try:
+            with open(temp_path, "wb") as f:
+                size, sha256 = self.copy_response(response, f)
+            self.store_file(temp_path, filepath, sha256)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return self.manifest_entry(response, size, sha256)
+        
+    def stream_to_sink(self, response, sink, name):
+        """응답 본문을 아카이브 항목 하나로 기록
+        
+        본문은 archive_spool_size 까지만 메모리에 두고 더 크면 임시 파일로
+        넘기므로 작업 하나가 쓰는 메모리는 그 크기를 넘지 않는다. 받는 동안에는
+        아카이브를 잠그지 않고, 다 받은 뒤 잠금을 잡고 청크 단위로 복사한다.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=self.archive_spool_size) as buffer:
+            size, sha256 = self.copy_response(response, buffer)
+            buffer.seek(0)
+            sink.write_stream(name, buffer, size, sha256)
+        return self.manifest_entry(response, size, sha256)
+        
+    def copy_response(self, response, f):
+        """응답 본문을 청크 단위로 f 에 쓰고 (크기, sha256) 을 반환
+        
+        크기 제한을 넘거나 본문이 Content-Length 보다 짧으면 예외를 발생시킨다.
+        """
+        content_length = response.headers.get('Content-Length')
+        expected = int(content_length) if content_length and content_length.isdigit() else None
+        if self.max_image_bytes and expected and expected > self.max_image_bytes:
+            raise ValueError(f"image too large ({expected} bytes)")
+            
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            if not chunk:
+                continue
+            size += len(chunk)
+            if self.max_image_bytes and size > self.max_image_bytes:
+                raise ValueError(f"image exceeds {self.max_image_bytes} bytes")
+            digest.update(chunk)
+            f.write(chunk)
+            self.add_downloaded_bytes(len(chunk))
+        # 압축 전송이 아니면 받은 크기가 Content-Length 와 같아야 함
+        if expected is not None and not response.headers.get('Content-Encoding') and size != expected:
+            raise TruncatedResponse(f"truncated response ({size}/{expected} bytes)")
+        return size, digest.hexdigest()
+        
+    def manifest_entry(self, response, size, sha256):
+        return {
+            'size': size,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': sha256
+        }
+        
+    def archive_target(self, folder, filename):
+        """아카이브 출력이면 (sink, 항목 이름), 파일 출력이면 (None, None)"""
+        if self.output == 'files':
+            return None, None
+        path = self.archive_path(folder)
+        if self.archive_scope == 'batch':
+            name = os.path.relpath(os.path.join(folder, filename), self.base_folder).replace(os.sep, '/')
+        else:
+            name = filename
+        with self.archive_lock:
+            sink = self.archive_sinks.get(path)
+            if sink is None:
+                sink = open_sink(self.output, path)
+                self.archive_sinks[path] = sink
+        return sink, name
+        
+    def archive_path(self, folder):
+        """folder 의 이미지가 들어갈 아카이브 경로 (확장자 제외)"""
+        if self.archive_scope == 'batch':
+            return os.path.join(self.base_folder, self.current_archive_name or self.archive_name or "batch")
+        return folder
+        
+    def close_archives(self, folder=None):
+        """열린 아카이브 닫기 (folder 를 주면 그 상품의 아카이브만)"""
+        with self.archive_lock:
+            paths = [path for path in self.archive_sinks if folder is None or path == folder]
+            sinks = [self.archive_sinks.pop(path) for path in paths]
+        for sink in sinks:
+            sink.close()
+        
+    def store_file(self, temp_path, filepath, sha256):
+        """완성된 임시 파일을 최종 위치로 옮김
+        
+        중복 제거를 켜면 파일은 blobs/<해시> 에 한 번만 저장되고 상품 폴더에는
+        하드 링크가 만들어진다. 하드 링크를 지원하지 않는 파일 시스템(FAT,
+        exFAT, 일부 SMB 공유 등)에서는 해시 저장소 없이 상품 폴더에만 저장한다.
+        """
+        if not self.dedup:
+            os.replace(temp_path, filepath)
+            return
+            
+        blob_path = self.blob_path(sha256, filepath)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with self.blob_lock:
+            stored = os.path.exists(blob_path)
+            if not stored:
+                try:
+                    os.link(temp_path, blob_path)
+                except OSError:
+                    pass
+        if stored:
+            os.remove(temp_path)
+            self.link_file(blob_path, filepath)
+        else:
+            # 새 blob 은 임시 파일에 하드 링크되어 있으므로 임시 파일을 그대로 최종 위치로 옮긴다
+            os.replace(temp_path, filepath)
+            
+    def prune_blobs(self):
+        """어느 상품 폴더에서도 링크하지 않는 blob 삭제 (링크 수가 1인 파일)
+        
+        상품 폴더를 지워도 blobs 의 원본은 남으므로 공간을 되찾으려면 이 메서드를
+        호출한다. 다운로드 중에는 호출하지 않는다. (삭제한 파일 수, 바이트 수) 를 반환한다.
+        """
+        removed = 0
+        freed = 0
+        with self.blob_lock:
+            for root, _, filenames in os.walk(self.blob_folder):
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                        if stat.st_nlink > 1:
+                            continue
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    removed += 1
+                    freed += stat.st_size
+            self.url_blobs = {}
+        return removed, freed
+        
+    def blob_path(self, sha256, filepath):
+        extension = os.path.splitext(filepath)[1]
+        return os.path.join(self.blob_folder, sha256[:2], sha256 + extension)
+        
+    def link_file(self, source, filepath):
+        """source 를 filepath 에 하드 링크 (지원하지 않는 파일 시스템이면 복사)"""
+        temp_path = filepath + ".link"
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, filepath)
+        
+    def add_downloaded_bytes(self, count):
+        with self.bytes_lock:
+            self.downloaded_bytes += count
+            
+    def download_image_parallel(self, url, folder, filename, manifest=None):
+        import requests
+        
+        filepath = os.path.join(folder, filename)
+        key = os.path.basename(folder)
+        start = time.perf_counter()
+        try:
+            headers = {}
+            # 아카이브 출력: 이미 기록된 항목은 건너뛰고 받은 본문은 아카이브에 바로 기록
+            sink, name = self.archive_target(folder, filename)
+            if sink is not None and self.incremental and sink.has(name):
+                self.metrics.count('incremental_skip', key=key)
+                return True
+                
+            entry = manifest.get(filename) if manifest is not None else None
+            if entry and entry.get('url') == url and self.is_valid_file(filepath, entry):
+                # 해시로 확인한 파일은 수정 시각을 기록해서 다음 실행에서는 해시를 생략
+                mtime = self.file_mtime(filepath)
+                if entry.get('mtime') != mtime:
+                    manifest.set(filename, dict(entry, mtime=mtime))
+                if not self.revalidate:
+                    self.metrics.count('incremental_skip', key=key)
+                    return True
+                # 서버에 변경 여부만 확인
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                if entry.get('last_modified'):
+                    headers['If-Modified-Since'] = entry['last_modified']
+                    
+            # 이번 작업에서 이미 받은 URL이면 다시 받지 않고 저장된 파일을 연결
+            if self.dedup and not headers and sink is None:
+                with self.blob_lock:
+                    known = self.url_blobs.get(url)
+                if known and os.path.exists(self.blob_path(known['sha256'], filepath)):
+                    self.link_file(self.blob_path(known['sha256'], filepath), filepath)
+                    if manifest is not None:
+                        manifest.set(filename, dict(url=url, mtime=self.file_mtime(filepath), **known))
+                    self.metrics.count('url_dedup_hit', key=key)
+                    return True
+                self.metrics.count('url_dedup_miss', key=key)
+                    
+            budget = self.get_host_budget(url)
+            budget.acquire()
+            throttled = False
+            retry_after = None
+            self.metrics.count('requests', key=key)
+            try:
+                with self.session.get(url, headers=headers, timeout=10, stream=True) as response:
+                    if response.status_code == 304 and headers:
+                        self.metrics.count('not_modified', key=key)
+                        return True
+                    if self.is_throttled(response.status_code):
+                        throttled = True
+                        retry_after = self.get_retry_after(response)
+                        return RetryLater(f"HTTP {response.status_code}", retry_after)
+                    if response.status_code != 200:
+                        self.metrics.count('request_errors', key=key)
+                        return False
+                    with self.metrics.span('transfer', key):
+                        if sink is not None:
+                            entry = self.stream_to_sink(response, sink, name)
+                        else:
+                            entry = self.stream_to_file(response, filepath)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.ContentDecodingError, TruncatedResponse) as e:
+                # 연결 오류와 전송 중 끊긴 본문은 재시도 큐로 보낸다
+                throttled = True
+                self.log(f"Error downloading {url}: {str(e)}")
+                return RetryLater(type(e).__name__)
+            finally:
+                budget.release(throttled, retry_after)
+                if throttled:
+                    self.metrics.count('request_errors', key=key)
+            if self.dedup and sink is None:
+                with self.blob_lock:
+                    self.url_blobs[url] = entry
+            if manifest is not None:
+                if sink is None:
+                    entry = dict(entry, mtime=self.file_mtime(filepath))
+                manifest.set(filename, dict(url=url, **entry))
+            self.metrics.count('images', key=key)
+            self.metrics.count('bytes', entry['size'], key=key)
+            return True
+        except Exception as e:
+            self.log(f"Error downloading {url}: {str(e)}")
+            return False
+        finally:
+            self.metrics.record('image', time.perf_counter() - start, key)
+            
+    def copy_duplicate(self, folder, source_filename, filename, manifest=None):
+        """같은 URL로 받은 파일을 다른 파일명으로 연결"""
+        try:
+            sink, name = self.archive_target(folder, filename)
+            if sink is not None:
+                sink.copy(self.archive_target(folder, source_filename)[1], name)
+                return True
+            self.link_file(os.path.join(folder, source_filename), os.path.join(folder, filename))
+            if manifest is not None and manifest.get(source_filename):
+                # 복사로 대신한 경우 수정 시각이 원본과 다르다
+                mtime = self.file_mtime(os.path.join(folder, filename))
+                manifest.set(filename, dict(manifest.get(source_filename), mtime=mtime))
+            return True
+        except (OSError, KeyError) as e:
+            self.log(f"Error linking {filename}: {str(e)}")
+            return False
+            
+    def download_images(self, jobs, folder):
+        """(url, filename, label) 목록을 스레드 풀에서 동시에 다운로드
+        
+        파일명은 제출 전에 정해지므로 완료 순서와 관계없이 항상 같다.
+        진행 상황은 호출한 스레드에서만 갱신한다.
+        """
+        succeeded = []
+        if not jobs:
+            return succeeded
+            
+        manifest = ProductManifest(folder) if self.incremental and self.output == 'files' else None
+        
+        # 같은 URL은 한 번만 받고 나머지 파일명은 받은 파일을 링크
+        primary_jobs = []
+        duplicates = {}
+        for url, filename, label in jobs:
+            if url in duplicates:
+                duplicates[url].append((filename, label))
+            else:
+                duplicates[url] = []
+                primary_jobs.append((url, filename, label))
+                
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(primary_jobs))) as executor:
+                futures = {
+                    executor.submit(self.download_image_parallel, url, folder, filename, manifest): (url, filename, label)
+                    for url, filename, label in primary_jobs
+                }
+                for future in as_completed(futures):
+                    url, filename, label = futures[future]
+                    ok = future.result()
+                    if isinstance(ok, RetryLater):
+                        self.schedule_retry(url, folder, filename, duplicates[url], label, ok, attempt=1)
+                    results = [(filename, label, ok)]
+                    for dup_filename, dup_label in duplicates[url]:
+                        results.append((dup_filename, dup_label, ok and self.copy_duplicate(folder, filename, dup_filename, manifest)))
+                        
+                    for result_filename, result_label, result_ok in results:
+                        if result_ok:
+                            succeeded.append(result_filename)
+                            self.log(f"Downloaded {result_label}")
+                        elif isinstance(result_ok, RetryLater):
+                            self.log(f"Failed to download {result_label} ({result_ok.reason}), will retry later")
+                        else:
+                            self.log(f"Failed to download {result_label}")
+                        self.downloaded_images += 1
+                        self.update_progress(self.downloaded_images, self.total_images)
+        finally:
+            if manifest is not None:
+                manifest.save()
+        return succeeded
+            
+    def schedule_retry(self, url, folder, filename, duplicates, label, failure, attempt):
+        """재시도 큐에 추가 (작업 스레드를 붙잡지 않고 배치가 끝난 뒤 처리)"""
+        if attempt > self.max_retries:
+            return
+        self.metrics.count('retries')
+        self.retry_queue.append({
+            'url': url,
+            'folder': folder,
+            'filename': filename,
+            'duplicates': list(duplicates),
+            'label': label,
+            'attempt': attempt,
+            'not_before': time.time() + self.backoff_delay(attempt, failure.retry_after)
+        })
+        
+    def run_retries(self, results):
+        """재시도 큐의 다운로드를 예정 시각 순서대로 다시 시도하고 결과를 갱신"""
+        if not self.retry_queue:
+            return
+        self.log(f"\nRetrying {len(self.retry_queue)} failed downloads...")
+        
+        result_index = {}
+        for result in results:
+            if result.get('folder'):
+                for filename in result['failed']:
+                    result_index[(result['folder'], filename)] = result
+                    
+        manifests = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.retry_queue:
+                pending = sorted(self.retry_queue, key=lambda job: job['not_before'])
+                self.retry_queue = []
+                futures = {}
+                for job in pending:
+                    # 예정 시각까지는 제출하는 스레드만 대기
+                    delay = job['not_before'] - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                    manifest = None
+                    if self.incremental and self.output == 'files':
+                        if job['folder'] not in manifests:
+                            manifests[job['folder']] = ProductManifest(job['folder'])
+                        manifest = manifests[job['folder']]
+                    future = executor.submit(self.download_image_parallel, job['url'], job['folder'], job['filename'], manifest)
+                    futures[future] = (job, manifest)
+                    
+                for future in as_completed(futures):
+                    job, manifest = futures[future]
+                    ok = future.result()
+                    if isinstance(ok, RetryLater):
+                        if job['attempt'] >= self.max_retries:
+                            self.log(f"Giving up on {job['label']} after {job['attempt']} retries")
+                        self.schedule_retry(job['url'], job['folder'], job['filename'], job['duplicates'],
+                                            job['label'], ok, attempt=job['attempt'] + 1)
+                        continue
+                    if not ok:
+                        self.log(f"Failed to download {job['label']} on retry")
+                        continue
+                        
+                    self.log(f"Downloaded {job['label']} on retry {job['attempt']}")
+                    recovered = [job['filename']]
+                    for dup_filename, _ in job['duplicates']:
+                        if self.copy_duplicate(job['folder'], job['filename'], dup_filename, manifest):
+                            recovered.append(dup_filename)
+                    for filename in recovered:
+                        result = result_index.get((job['folder'], filename))
+                        if result and filename in result['failed']:
+                            result['failed'].remove(filename)
+                            result['downloaded'].append(filename)
+                            
+        for manifest in manifests.values():
+            manifest.save()
+            
+    def extract_pcode(self, text):
+        if text.isdigit():
+            return text
+        try:
+            query = urlparse(text).query
+            params = parse_qs(query)
+            pcode = params.get("pcode", [None])[0]
+            if pcode and pcode.isdigit():
+                return pcode
+        except:
+            pass
+        return None
+        
+    def is_direct_image_url(self, url):
+        return ('iws.danawa.com' in url or 'img.danawa.com' in url or url.startswith(self.image_base_url)) and url.endswith('.jpg')
+        
+    def extract_detail_urls(self, html, scoped=True):
+        """HTML에서 상세페이지 이미지 URL 목록 추출"""
+        with self.metrics.span('parse'):
+            sources = extract_image_sources(html, scoped=scoped, parser=self.html_parser)
+        return self.detail_urls_from_sources(sources)
+        
+    def detail_urls_from_sources(self, sources):
+        """img src 목록에서 상세페이지 이미지 URL 목록 구성"""
+        self.log(f"Found {len(sources)} detail images")
+        
+        detail_urls = []
+        for src in sources:
+            if src and ('add_1' in src or 'prod_img' in src):
+                if src.startswith('//'):
+                    src = 'https:' + src
+                elif src.startswith('/'):
+                    src = self.product_base_url + src
+                    
+                if src.endswith('.jpg'):
+                    base_url = src.split('?')[0]
+                    detail_urls.append(self.image_variants(base_url, 'detail'))
+                    self.log(f"Found detail image URL: {base_url}")
+        return detail_urls
+        
+    def resolve_details_http(self, pcode, page=None):
+        """브라우저 없이 정적 HTML과 상세정보 엔드포인트에서 상세 이미지 찾기
+        
+        page 는 이미 받은 상품 페이지 HTML (없으면 새로 요청)
+        """
+        page_url = self.product_url(pcode)
+        if page is None:
+            page = self.fetch_product_page(pcode)
+        if page is not None:
+            detail_urls = self.extract_detail_urls(page)
+            if detail_urls:
+                return detail_urls
+                
+        # "상품정보 더보기" 버튼이 호출하는 상세정보 엔드포인트
+        if not self.detail_content_path:
+            return []
+        response = self.fetch(
+            self.product_base_url + self.detail_content_path.format(pcode=pcode),
+            headers={'Referer': page_url, 'X-Requested-With': 'XMLHttpRequest'}
+        )
+        if response is None or response.status_code != 200:
+            return []
+        # 엔드포인트는 .detail_cont 없이 조각 HTML만 돌려주므로 모든 img 검사
+        return self.extract_detail_urls(response.text, scoped=False)
+        
+    def resolve_details_selenium(self, pcode, page=None):
+        """Selenium으로 페이지를 렌더링해서 상세 이미지 찾기 (풀에서 드라이버를 빌려 사용, page 는 쓰지 않음)"""
+        from selenium.common.exceptions import TimeoutException
+        
+        url = self.product_url(pcode)
+        budget = self.get_host_budget(url)
+        start = time.perf_counter()
+        with self.driver_pool.lease() as driver:
+            self.metrics.record('driver_acquire', time.perf_counter() - start, pcode)
+            # 페이지 로드 시간 초과는 백오프 후 다시 시도
+            with self.metrics.span('page_load', pcode):
+                for attempt in range(1, self.max_retries + 2):
+                    budget.acquire()
+                    timed_out = False
+                    self.metrics.count('requests')
+                    try:
+                        driver.get(url)
+                    except TimeoutException:
+                        timed_out = True
+                        self.metrics.count('request_errors')
+                        if attempt > self.max_retries:
+                            raise
+                    finally:
+                        budget.release(timed_out)
+                    if not timed_out:
+                        break
+                    delay = self.backoff_delay(attempt)
+                    self.log(f"Page load timed out, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+            
+            # 더보기 버튼 클릭, 지연 로딩 스크롤, DOM/네트워크가 조용해질 때까지 대기를 한 번에 처리
+            driver.set_script_timeout(self.page_ready_timeout + 5)
+            with self.metrics.span('page_ready', pcode):
+                ready = driver.execute_async_script(
+                    PAGE_READY_SCRIPT,
+                    DETAIL_IMAGE_SELECTOR,
+                    self.page_quiet_ms,
+                    int(self.page_ready_timeout * 1000)
+                ) or {}
+            if ready.get('clicked'):
+                self.log("Clicked '상품정보 더보기' button")
+            else:
+                self.log("No '상품정보 더보기' button found")
+            self.log(f"Page ready after {ready.get('elapsed', 0) / 1000:.1f}s")
+            sources = ready.get('sources')
+        return self.detail_urls_from_sources(sources or [])
+        
+    def record_resolver(self, name, count=1):
+        """상품별로 어떤 리졸버가 상세 이미지를 찾았는지 집계"""
+        with self.resolver_lock:
+            self.resolver_counts[name] = self.resolver_counts.get(name, 0) + count
+            
+    def image_variants(self, base_url, kind):
+        """이미지 한 장의 크기별 URL ('thumbnail' 또는 'detail')"""
+        return {
+            'kind': kind,
+            '500px': f"{base_url}?shrink=500",
+            '890px': f"{base_url}?shrink=890",
+            'original': base_url
+        }
+        
+    def product_url(self, pcode):
+        return f"{self.product_base_url}/info/?pcode={pcode}"
+        
+    def thumbnail_url(self, pcode, index):
+        return f"{self.image_base_url}/prod_img/500000/{pcode[-3:]}/{pcode[-6:-3]}/img/{pcode}_{index}.jpg"
+        
+    def fetch_product_page(self, pcode):
+        """상품 페이지 HTML (실패하면 None)"""
+        with self.metrics.span('page_fetch', pcode):
+            response = self.fetch(self.product_url(pcode))
+        if response is not None and response.status_code == 200:
+            return response.text
+        return None
+        
+    def thumbnail_indexes(self, pcode, html):
+        """상품 페이지의 썸네일 갤러리에 있는 이미지 번호 목록 (<pcode>_<번호>.jpg)"""
+        pattern = re.compile(r"/img/" + re.escape(pcode) + r"_(\d+)\.jpg")
+        indexes = {int(index) for index in pattern.findall(html)}
+        return sorted(index for index in indexes if 1 <= index <= self.max_thumbnails)
+        
+    def get_product_images(self, pcode):
+        # 리졸브 단계는 다운로드와 동시에 실행되므로 진행 상태 레이블은 건드리지 않는다
+        try:
+            # 1. 상품 페이지의 갤러리에 있는 썸네일만 사용 (페이지는 상세 이미지 리졸버와 공유)
+            thumbnail_urls = []
+            page = self.fetch_product_page(pcode)
+            indexes = self.thumbnail_indexes(pcode, page) if page else []
+            if indexes:
+                self.log(f"Found {len(indexes)} thumbnails for {pcode}")
+            else:
+                self.log(f"Thumbnail gallery not found, assuming {self.default_thumbnails} thumbnails")
+                indexes = range(1, self.default_thumbnails + 1)
+            for i in indexes:
+                base_url = self.thumbnail_url(pcode, i)
+                thumbnail_urls.append(self.image_variants(base_url, 'thumbnail'))
+                self.log(f"Generated thumbnail URL: {base_url}")
+            
+            # 2. 상세페이지 이미지 URL 찾기 (빠른 리졸버부터 차례로 시도)
+            detail_urls = []
+            for name, resolver in self.detail_resolvers:
+                try:
+                    with self.metrics.span(f"resolver_{name}", pcode):
+                        detail_urls = resolver(pcode, page)
+                except Exception as e:
+                    self.log(f"{name} resolver error: {str(e)}")
+                    detail_urls = []
+                if detail_urls:
+                    self.record_resolver(name)
+                    self.log(f"Detail images resolved via {name} resolver")
+                    break
+            else:
+                self.record_resolver('none')
+            
+            return thumbnail_urls + detail_urls
+            
+        except Exception as e:
+            self.log(f"Error fetching images from page: {str(e)}")
+            return thumbnail_urls
+            
+    def plan_variants(self, kind, image, filename_for, label):
+        """변형 정책에 따라 (다운로드 작업 목록, 로컬 생성 목록) 구성
+        
+        derive_variants 가 켜져 있고 Pillow 를 쓸 수 있으면 가장 큰 크기만
+        받고, 작은 크기는 (원본 파일명, 대상 파일명, 가로 크기) 로 돌려준다.
+        """
+        variants = self.variant_policy[kind]
+        if len(variants) == 1:
+            return [(image[variants[0]], filename_for(variants[0]), label)], []
+            
+        order = list(VARIANT_WIDTHS)
+        largest = max(variants, key=order.index)
+        # 아카이브 출력은 디스크 파일이 없으므로 모든 크기를 직접 받는다
+        if self.derive_variants and self.output == 'files' and self.can_resize():
+            jobs = [(image[largest], filename_for(largest), f"{largest} version of {label}")]
+            derived = [
+                (filename_for(largest), filename_for(variant), VARIANT_WIDTHS[variant])
+                for variant in variants if variant != largest
+            ]
+            return jobs, derived
+        return [(image[variant], filename_for(variant), f"{variant} version of {label}") for variant in variants], []
+        
+    def can_resize(self):
+        return importlib.util.find_spec("PIL") is not None
+        
+    def derive_images(self, folder, derived, succeeded):
+        """받은 큰 이미지로 작은 크기를 프로세스 풀에서 만들고 만든 파일명 목록을 반환
+        
+        증분 모드에서는 원본보다 나중에 만든 대상 파일이 이미 있으면 다시 만들지 않는다.
+        """
+        created = []
+        derived = [item for item in derived if item[0] in set(succeeded)]
+        if self.incremental:
+            pending = []
+            for source, target, width in derived:
+                if self.is_up_to_date(os.path.join(folder, target), os.path.join(folder, source)):
+                    created.append(target)
+                    self.metrics.count('incremental_skip', key=os.path.basename(folder))
+                    self.downloaded_images += 1
+                    self.update_progress(self.downloaded_images, self.total_images)
+                else:
+                    pending.append((source, target, width))
+            derived = pending
+        if not derived:
+            return created
+            
+        if self.resize_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.resize_pool = ProcessPoolExecutor()
+        start = time.perf_counter()
+        futures = {
+            self.resize_pool.submit(
+                resize_image,
+                os.path.join(folder, source),
+                os.path.join(folder, target),
+                width,
+                self.resize_quality
+            ): target
+            for source, target, width in derived
+        }
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                future.result()
+                created.append(target)
+                self.log(f"Created {target}")
+            except Exception as e:
+                self.log(f"Error creating {target}: {str(e)}")
+            self.downloaded_images += 1
+            self.update_progress(self.downloaded_images, self.total_images)
+        self.metrics.record('derive', time.perf_counter() - start, os.path.basename(folder))
+        return created
+        
+    def is_up_to_date(self, target, source):
+        """target 이 있고 source 보다 나중에 수정되었는지 확인"""
+        try:
+            return os.stat(target).st_mtime_ns >= os.stat(source).st_mtime_ns
+        except OSError:
+            return False
+            
+    def build_result(self, source, pcode, folder, jobs=(), succeeded=(), error=None):
+        """상품(또는 이미지 URL) 하나의 처리 결과"""
+        succeeded = set(succeeded)
+        filenames = [filename for _, filename, _ in jobs]
+        result = {
+            'input': source.strip(),
+            'pcode': pcode,
+            'folder': folder,
+            'downloaded': [filename for filename in filenames if filename in succeeded],
+            'failed': [filename for filename in filenames if filename not in succeeded],
+            'error': error
+        }
+        # 아카이브 출력이면 이미지가 들어간 아카이브 경로도 기록
+        if folder and self.output != 'files':
+            result['archive'] = self.archive_path(folder) + open_sink_extension(self.output)
+        return result
+        
+    def process_direct_image_url(self, url):
+        # Extract pcode from URL if possible
+        pcode = None
+        product_folder = None
+        try:
+            if '/prod_' in url:
+                pcode_match = re.search(r'/prod_(\d+)/', url)
+                if pcode_match:
+                    pcode = pcode_match.group(1)
+            
+            # Create folder
+            if pcode:
+                product_folder = os.path.join(self.base_folder, pcode)
+            else:
+                product_folder = os.path.join(self.base_folder, "direct")
+            if self.output == 'files':
+                os.makedirs(product_folder, exist_ok=True)
+            
+            # Get base URL without parameters
+            base_url = url.split('?')[0]
+            
+            # 변형 정책에 따라 필요한 크기만 받기
+            filename = os.path.basename(base_url)
+            stem = os.path.splitext(filename)[0]
+            jobs, derived = self.plan_variants(
+                'direct',
+                self.image_variants(base_url, 'direct'),
+                lambda variant: f"{stem}_{variant}.jpg",
+                filename
+            )
+            self.total_images = len(jobs) + len(derived)
+            self.downloaded_images = 0
+            succeeded = self.download_images(jobs, product_folder)
+            succeeded += self.derive_images(product_folder, derived, succeeded)
+            jobs += [(None, target, target) for _, target, _ in derived]
+            return self.build_result(url, pcode, product_folder, jobs, succeeded)
+                
+        except Exception as e:
+            self.log(f"Error processing direct image URL: {e}")
+            return self.build_result(url, pcode, product_folder, error=str(e))
+            
+    def resolve_url(self, url):
+        """입력 한 줄을 다운로드할 작업으로 변환 (리졸브 단계)"""
+        url = url.strip()
+        if not url:
+            return None
+            
+        if self.is_direct_image_url(url):
+            return {'type': 'direct', 'url': url, 'source': url}
+            
+        pcode = self.extract_pcode(url)
+        if not pcode:
+            self.log(f"Invalid URL: {url}")
+            return None
+            
+        self.log(f"\nResolving product code: {pcode}")
+        with self.metrics.span('resolve', pcode):
+            images = None if self.force_refresh else self.resolution_cache.get(pcode)
+            # 이미지 종류('kind')가 없는 예전 형식의 캐시는 사용하지 않음
+            if images is not None and all('kind' in img for img in images):
+                self.log(f"Using cached image list for {pcode}")
+                self.metrics.count('resolution_cache_hit', key=pcode)
+            else:
+                if not self.force_refresh:
+                    self.metrics.count('resolution_cache_miss', key=pcode)
+                images = self.get_product_images(pcode)
+                # 상세 이미지를 찾지 못한 결과도 캐시 (negative_cache_ttl 이 지나면 다시 시도)
+                self.resolution_cache.put(pcode, images)
+        return {'type': 'product', 'pcode': pcode, 'images': images, 'source': url}
+        
+    def download_resolved(self, item):
+        """리졸브된 작업의 이미지를 다운로드 (다운로드 단계)"""
+        with self.metrics.span('download', item.get('pcode')):
+            try:
+                if item['type'] == 'direct':
+                    self.log(f"\nProcessing direct image URL: {item['url']}")
+                    return self.process_direct_image_url(item['url'])
+                return self.download_product(item)
+            finally:
+                # 상품별 아카이브는 상품이 끝나면 닫는다 (재시도 때는 다시 열어서 이어 씀)
+                if self.archive_scope == 'product':
+                    self.close_archives()
+            
+    def download_product(self, item):
+        """상품 하나의 썸네일과 상세페이지 이미지를 다운로드"""
+        pcode = item['pcode']
+        images = item['images']
+        self.log(f"\nProcessing product code: {pcode}")
+        
+        # Create folder for this product
+        product_folder = os.path.join(self.base_folder, pcode)
+        if self.output == 'files':
+            os.makedirs(product_folder, exist_ok=True)
+        
+        # 마지막 다운로드 폴더 업데이트
+        self.last_download_folder = product_folder
+        
+        if not images:
+            self.log(f"No images found for product {pcode}")
+            return self.build_result(item['source'], pcode, product_folder, error="no images found")
+            
+        self.log(f"Found {len(images)} images")
+        
+        # 다운로드 작업 목록 구성 (파일명은 목록 순서로 미리 결정)
+        jobs = []
+        derived = []
+        thumbnails = [img for img in images if img['kind'] == 'thumbnail']
+        details = [img for img in images if img['kind'] == 'detail']
+        for i, img in enumerate(thumbnails, 1):
+            image_jobs, image_derived = self.plan_variants(
+                'thumbnail', img, lambda variant: f"image_{i}_{variant}.jpg", f"thumbnail image {i}"
+            )
+            jobs += image_jobs
+            derived += image_derived
+        for i, img in enumerate(details, 1):
+            image_jobs, image_derived = self.plan_variants(
+                'detail', img,
+                lambda variant: f"상세페이지_{i}.jpg" if variant == 'original' else f"상세페이지_{i}_{variant}.jpg",
+                f"detail page image {i}"
+            )
+            jobs += image_jobs
+            derived += image_derived
+        
+        # 다운로드 진행 상태 초기화
+        self.total_images = len(jobs) + len(derived)
+        self.downloaded_images = 0
+        self.update_progress(0, self.total_images)
+        
+        # 썸네일과 상세페이지 이미지를 동시에 다운로드한 뒤 작은 크기 생성
+        succeeded = self.download_images(jobs, product_folder)
+        succeeded += self.derive_images(product_folder, derived, succeeded)
+        jobs += [(None, target, target) for _, target, _ in derived]
+        
+        # 다운로드 완료
+        self.set_status("다운로드 완료!", progress=100)  # 확실하게 100%로 설정
+        return self.build_result(item['source'], pcode, product_folder, jobs, succeeded)
+        
+    def is_complete(self, result):
+        """결과를 배치 저널에 완료로 기록해도 되는지
+        
+        재시도 큐에 남은 이미지가 있거나, 배치 전체를 묶는 zip/tar 아카이브에
+        기록된 경우는 아직 완료가 아니다. zip 은 닫을 때 목록(중앙 디렉터리)을
+        쓰고 tar 는 마지막 항목이 잘릴 수 있어서, 닫기 전에 중단되면 그 안의
+        이미지를 읽을 수 없기 때문이다 (pack 은 항목마다 색인을 남기므로 해당 없음).
+        """
+        if self.archive_scope == 'batch' and self.output in ('zip', 'tar'):
+            return False
+        folder = result.get('folder')
+        return not any(job['folder'] == folder for job in self.retry_queue)
+        
+    def process_url(self, url):
+        item = self.resolve_url(url)
+        if item:
+            return self.download_resolved(item)
+        return None
+            
+    def run_pipeline(self, urls):
+        """리졸브 단계와 다운로드 단계를 겹쳐서 실행
+        
+        리졸브 스레드가 다음 상품 페이지를 분석하는 동안 현재 상품의
+        이미지를 다운로드한다. 큐 크기가 제한되어 있어 입력 목록이
+        길어도 메모리에 쌓이는 작업 수는 pipeline_depth 를 넘지 않는다.
+        
+        완료된 입력은 배치 저널에 기록되어, 중간에 종료되더라도 같은
+        목록으로 다시 시작하면 남은 항목부터 이어서 처리한다. 재시도를
+        기다리는 이미지가 있는 입력은 기록하지 않으므로 재시도 중에
+        종료되면 다시 처리된다.
+        
+        이번 실행에서 처리한 입력별 결과 목록을 반환한다.
+        """
+        journal = BatchJournal(os.path.join(self.base_folder, "batch_journal.jsonl"))
+        done = journal.start(urls)
+        if done:
+            self.log(f"Resuming previous batch: {len(done)} entries already completed")
+            
+        resolved_queue = queue.Queue(maxsize=self.pipeline_depth)
+        stop_event = threading.Event()
+        url_iter = (url for url in urls if url.strip() and url.strip() not in done)
+        url_lock = threading.Lock()
+        results = []
+        results_lock = threading.Lock()
+        
+        def add_result(result):
+            with results_lock:
+                results.append(result)
+        
+        def next_url():
+            with url_lock:
+                return next(url_iter, None)
+        
+        def resolve_stage():
+            try:
+                while not stop_event.is_set():
+                    url = next_url()
+                    if url is None:
+                        break
+                    try:
+                        item = self.resolve_url(url)
+                    except Exception as e:
+                        self.log(f"Error resolving {url.strip()}: {str(e)}")
+                        add_result(self.build_result(url, None, None, error=str(e)))
+                        continue
+                    if item:
+                        resolved_queue.put(item)
+                    else:
+                        add_result(self.build_result(url, None, None, error="invalid input"))
+            finally:
+                resolved_queue.put(None)
+                
+        # 드라이버 풀 크기만큼 리졸브 스레드를 띄워 상품 페이지를 병렬로 분석
+        resolvers = [
+            threading.Thread(target=resolve_stage, daemon=True)
+            for _ in range(max(1, self.resolve_workers))
+        ]
+        for resolver in resolvers:
+            resolver.start()
+            
+        try:
+            finished = 0
+            while finished < len(resolvers):
+                item = resolved_queue.get()
+                if item is None:
+                    finished += 1
+                    continue
+                try:
+                    result = self.download_resolved(item)
+                    add_result(result)
+                    # 재시도가 남은 입력은 재시도가 끝난 뒤에야 완료로 본다
+                    if self.is_complete(result):
+                        journal.mark_done(item['source'])
+                except Exception as e:
+                    self.log(f"Error downloading {item.get('pcode') or item.get('url')}: {str(e)}")
+                    add_result(self.build_result(item['source'], item.get('pcode'), None, error=str(e)))
+            self.run_retries(results)
+            self.close_archives()
+            journal.finish()
+        finally:
+            # 다운로드 단계가 중단되면 리졸브 단계도 멈추도록 큐를 비운다
+            stop_event.set()
+            while any(resolver.is_alive() for resolver in resolvers):
+                try:
+                    resolved_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        return results
+        
+    def download(self, urls):
+        """입력 목록을 모두 처리하고 상품별 결과 목록을 반환"""
+        self.resolver_counts = {}
+        self.downloaded_bytes = 0
+        self.url_blobs = {}
+        self.retry_queue = []
+        self.metrics.reset()
+        self.current_archive_name = self.archive_name or time.strftime("batch_%Y%m%d_%H%M%S")
+        
+        try:
+            results = self.run_pipeline(urls)
+        finally:
+            self.close_archives()
+        self.metrics.finish()
+        self.log("\nDownload process completed!")
+        if self.resolver_counts:
+            summary = ", ".join(f"{name}={count}" for name, count in sorted(self.resolver_counts.items()))
+            self.log(f"Detail resolvers: {summary}")
+        self.write_run_report(results)
+        return results
+        
+    def download_sharded(self, urls, processes=None):
+        """입력 목록을 여러 프로세스로 나눠 처리 (danawa_shard.download_sharded 참고)"""
+        from danawa_shard import download_sharded
+        return download_sharded(self, urls, processes)
+        
+    def write_run_report(self, results):
+        """배치 보고서 저장과 지표 내보내기 (실패해도 배치 결과에는 영향 없음)"""
+        try:
+            if self.write_reports:
+                json_path, csv_path = self.metrics.write_report(self.report_folder, results)
+                self.log(f"Report saved: {json_path}, {csv_path}")
+            self.export_metrics()
+        except Exception as e:
+            self.log(f"Error writing report: {str(e)}")
+            
+    def export_metrics(self):
+        """배치 지표 내보내기 훅 (기본은 Prometheus textfile, 다른 저장소로 보내려면 재정의)"""
+        if self.prometheus_textfile:
+            self.metrics.write_prometheus(self.prometheus_textfile)
+        
+    def prewarm(self, browser=True):
+        """사용자가 입력하는 동안 HTTP 세션, HTML 파서, 드라이버를 미리 준비 (백그라운드 스레드)
+        
+        browser 가 True 이고 Selenium 리졸버를 쓰는 경우에만 Chrome 을 하나 띄워 둔다.
+        준비 중 오류는 로그만 남기고, 실제 작업에서 다시 시도한다.
+        """
+        def warm():
+            try:
+                self.session
+                extract_image_sources("<html></html>", parser=self.html_parser)
+                if browser and any(name == 'selenium' for name, _ in self.detail_resolvers):
+                    self.driver_pool.warm()
+            except Exception as e:
+                self.log(f"Prewarm failed: {str(e)}")
+                
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+        
+    def close(self):
+        self.close_archives()
+        if self.resize_pool is not None:
+            self.resize_pool.shutdown()
+        self.driver_pool.close()
+        self.resolution_cache.close()
+        if self.http_session is not None:
+            self.http_session.close()
+        
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="다나와 상품 이미지 일괄 다운로드")
+    parser.add_argument("urls", nargs="*", help="상품 URL, 상품 번호 또는 이미지 URL")
+    parser.add_argument("--input", "-i", help="한 줄에 하나씩 입력이 적힌 파일 (- 이면 표준 입력)")
+    parser.add_argument("--out", "-o", default="danawa_images", help="저장 폴더 (기본값: danawa_images)")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="동시 다운로드 수 (기본값: 8)")
+    parser.add_argument("--drivers", type=int, default=2, help="Chrome 드라이버 수 (기본값: 2)")
+    parser.add_argument("--processes", "-p", type=int, default=1, help="작업 프로세스 수 (2 이상이면 입력을 나눠 병렬 처리, 0 이면 CPU 수)")
+    parser.add_argument("--transport", choices=["requests", "httpx"], default="requests", help="HTTP 클라이언트 (httpx 는 HTTP/2 사용)")
+    parser.add_argument("--force-refresh", action="store_true", help="캐시를 무시하고 상품 페이지를 다시 분석")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 60 * 60, help="이미지 URL 캐시 유효 시간 (초, 기본값: 86400)")
+    parser.add_argument("--negative-cache-ttl", type=float, default=60 * 60, help="상세 이미지를 찾지 못한 상품의 캐시 유효 시간 (초, 기본값: 3600)")
+    parser.add_argument("--cache-max-entries", type=int, default=5000, help="이미지 URL 캐시 최대 상품 수 (기본값: 5000)")
+    parser.add_argument("--thumbnail-sizes", nargs="+", choices=list(VARIANT_WIDTHS), help="썸네일로 받을 크기 (기본값: 500px)")
+    parser.add_argument("--detail-sizes", nargs="+", choices=list(VARIANT_WIDTHS), help="상세 이미지로 받을 크기 (기본값: original)")
+    parser.add_argument("--direct-sizes", nargs="+", choices=list(VARIANT_WIDTHS), help="이미지 URL 입력에서 받을 크기 (기본값: 500px 890px)")
+    parser.add_argument("--derive", action="store_true", help="가장 큰 크기만 받고 나머지는 Pillow로 만들기")
+    parser.add_argument("--output", choices=["files"] + list(ARCHIVE_FORMATS), default="files", help="저장 방식 (기본값: 상품 폴더에 파일로 저장)")
+    parser.add_argument("--archive-scope", choices=["product", "batch"], default="product", help="아카이브를 상품마다 만들지 배치마다 하나로 만들지 (기본값: product)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument("--prune-blobs", action="store_true", help="어느 상품 폴더에서도 쓰지 않는 중복 제거 저장소(blobs) 파일 삭제")
+    parser.add_argument("--no-report", action="store_true", help="배치 보고서(reports 폴더의 JSON/CSV)를 만들지 않기")
+    parser.add_argument("--prometheus-textfile", help="배치 지표를 Prometheus textfile 형식으로 저장할 경로")
+    parser.add_argument("--product-base-url", help="상품 페이지 서버 주소 (기본값: https://prod.danawa.com, 벤치마크용)")
+    parser.add_argument("--image-base-url", help="이미지 서버 주소 (기본값: https://img.danawa.com, 벤치마크용)")
+    args = parser.parse_args(argv)
+    
+    urls = list(args.urls)
+    if args.input:
+        if args.input == "-":
+            urls.extend(sys.stdin.read().splitlines())
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                urls.extend(f.read().splitlines())
+    if not any(url.strip() for url in urls) and not args.prune_blobs:
+        parser.error("no input given")
+        
+    downloader = DanawaDownloader(
+        base_folder=args.out,
+        max_workers=args.concurrency,
+        driver_pool_size=args.drivers,
+        transport=args.transport,
+        cache_ttl=args.cache_ttl,
+        cache_max_entries=args.cache_max_entries,
+        negative_cache_ttl=args.negative_cache_ttl
+    )
+    downloader.force_refresh = args.force_refresh
+    downloader.derive_variants = args.derive
+    downloader.write_reports = not args.no_report
+    downloader.output = args.output
+    downloader.archive_scope = args.archive_scope
+    downloader.prometheus_textfile = args.prometheus_textfile
+    if args.product_base_url:
+        downloader.product_base_url = args.product_base_url.rstrip('/')
+    if args.image_base_url:
+        downloader.image_base_url = args.image_base_url.rstrip('/')
+    for kind, sizes in (('thumbnail', args.thumbnail_sizes), ('detail', args.detail_sizes), ('direct', args.direct_sizes)):
+        if sizes:
+            downloader.variant_policy[kind] = sizes
+    if args.json:
+        # JSON 출력과 섞이지 않도록 로그는 표준 오류로 보낸다
+        downloader.log = lambda message: print(message, file=sys.stderr)
+    try:
+        if not any(url.strip() for url in urls):
+            results = []
+        elif args.processes == 1:
+            results = downloader.download(urls)
+        else:
+            results = downloader.download_sharded(urls, args.processes or None)
+        if args.prune_blobs:
+            removed, freed = downloader.prune_blobs()
+            downloader.log(f"Pruned {removed} unused blobs ({freed / (1024 * 1024):.1f} MB)")
+    finally:
+        downloader.close()
+        
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    failed = [result for result in results if result['failed'] or result['error']]
+    return 1 if failed else 0
+    
+
+if __name__ == "__main__":
+    sys.exit(main())
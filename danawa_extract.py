@@ -0,0 +1,108 @@
+import importlib.util
+
+
+# 상세 이미지가 들어 있는 영역 (예전 선택자 목록의 'a img', 'div img' 는 모두 하위 img 에 포함됨)
+DETAIL_IMAGE_SELECTOR = '.detail_cont img, .prod_detail img'
+
+DETAIL_IMAGE_XPATH = (
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' detail_cont ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' prod_detail ')]//img"
+)
+
+# 상세 이미지가 다 나타날 때까지 기다렸다가 주소를 돌려주는 비동기 스크립트
+#
+# "상품정보 더보기" 버튼이 보이면 누르고, 한 화면씩 스크롤해서 지연 로딩을
+# 유도한다. 페이지 끝까지 내려간 뒤 상세 영역의 이미지 주소 목록(src/data-src)이
+# quiet_ms 동안 그대로면 (또는 timeout_ms 가 지나면) 바로 끝낸다. 배너, 광고,
+# 추적 스크립트처럼 상세 영역 밖의 변화는 보지 않는다.
+# 인자: selector, quiet_ms, timeout_ms / 반환: {sources, clicked, elapsed}
+PAGE_READY_SCRIPT = """
+var selector = arguments[0], quietMs = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), lastChange = Date.now();
+var clicked = false, lastSources = null, y = 0;
+
+function sources() {
+    return Array.from(document.querySelectorAll(selector)).map(function (img) {
+        return img.getAttribute('src') || img.getAttribute('data-src') || '';
+    });
+}
+
+(function poll() {
+    if (!clicked) {
+        var more = document.querySelector('button.btn_more, button.btn_more_detail');
+        if (more) {
+            try { more.click(); clicked = true; } catch (e) {}
+        }
+    }
+    var height = document.body ? document.body.scrollHeight : 0;
+    if (y < height) {
+        y += window.innerHeight || 800;
+        window.scrollTo(0, y);
+    }
+    var current = sources().join('\\n');
+    if (current !== lastSources) {
+        lastSources = current;
+        lastChange = Date.now();
+    }
+    var now = Date.now();
+    if ((y >= height && now - lastChange >= quietMs) || now - start >= timeoutMs) {
+        done({sources: sources(), clicked: clicked, elapsed: now - start});
+        return;
+    }
+    setTimeout(poll, 100);
+})();
+"""
+
+PARSERS = ('selectolax', 'lxml', 'html.parser')
+
+
+def available_parsers():
+    """설치된 HTML 파서 목록 (빠른 것부터)"""
+    parsers = []
+    if importlib.util.find_spec("selectolax") is not None:
+        parsers.append('selectolax')
+    if importlib.util.find_spec("lxml") is not None:
+        parsers.append('lxml')
+    parsers.append('html.parser')
+    return parsers
+
+
+def extract_image_sources(html, scoped=True, parser='auto'):
+    """HTML에서 img 태그의 src (없으면 data-src) 목록 추출
+
+    scoped 가 참이면 상세 영역(.detail_cont, .prod_detail) 안의 이미지만 찾는다.
+    parser 가 'auto' 이면 설치된 파서 중 가장 빠른 것을 쓴다
+    (selectolax → lxml → BeautifulSoup html.parser).
+    """
+    if parser == 'auto':
+        parser = available_parsers()[0]
+
+    if parser == 'selectolax':
+        from selectolax.lexbor import LexborHTMLParser
+        nodes = LexborHTMLParser(html).css(DETAIL_IMAGE_SELECTOR if scoped else 'img')
+        # 상세 영역이 겹쳐 있으면 같은 img 가 두 번 나오므로 한 번만 사용
+        seen = set()
+        sources = []
+        for node in nodes:
+            if node.mem_id in seen:
+                continue
+            seen.add(node.mem_id)
+            sources.append(node.attributes.get('src') or node.attributes.get('data-src') or '')
+        return sources
+
+    if parser == 'lxml':
+        import lxml.html
+        if not html.strip():
+            return []
+        tree = lxml.html.fromstring(html)
+        nodes = tree.xpath(DETAIL_IMAGE_XPATH if scoped else '//img')
+        return [node.get('src') or node.get('data-src') or '' for node in nodes]
+
+    if parser == 'html.parser':
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        nodes = soup.select(DETAIL_IMAGE_SELECTOR if scoped else 'img')
+        return [node.get('src', '') or node.get('data-src', '') for node in nodes]
+
+    raise ValueError(f"unknown parser: {parser}")
@@ -1,21 +1,15 @@
 import os
-import re
-import requests
-from urllib.parse import urlparse, parse_qs
-from tkinter import Tk, Label, Button, Text, END, Scrollbar, RIGHT, Y, Frame, LEFT, font, ttk, DoubleVar
-from bs4 import BeautifulSoup
-import threading
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import subprocess
 import sys
+import time
+import queue
+import subprocess
+import multiprocessing
+import threading
+from tkinter import Tk, Label, Button, Checkbutton, Text, END, Scrollbar, RIGHT, Y, Frame, LEFT, font, ttk, DoubleVar, BooleanVar
+
+from danawa_core import DanawaDownloader
 
-class DanawaImageDownloader:
+class DanawaImageDownloader(DanawaDownloader):
     def __init__(self):
         self.root = Tk()
         self.root.title("다나와 이미지 다운로더 By noName_Come")
@@ -120,6 +114,35 @@ class DanawaImageDownloader:
         )
         self.url_text.pack(fill='x', pady=(0, 10))
         
+        # 캐시 무시 옵션
+        self.force_refresh_var = BooleanVar(value=False)
+        Checkbutton(
+            input_frame,
+            text="캐시 무시하고 새로 찾기",
+            variable=self.force_refresh_var,
+            font=(self.style['font_family'], self.style['text_font_size']),
+            bg=self.style['bg_color'],
+            fg=self.style['text_color'],
+            selectcolor=self.style['input_bg'],
+            activebackground=self.style['bg_color'],
+            activeforeground=self.style['text_color']
+        ).pack(anchor='w')
+        
+        # 실시간 통계 표시 옵션
+        self.show_stats_var = BooleanVar(value=False)
+        Checkbutton(
+            input_frame,
+            text="실시간 통계 보기",
+            variable=self.show_stats_var,
+            command=self.toggle_stats,
+            font=(self.style['font_family'], self.style['text_font_size']),
+            bg=self.style['bg_color'],
+            fg=self.style['text_color'],
+            selectcolor=self.style['input_bg'],
+            activebackground=self.style['bg_color'],
+            activeforeground=self.style['text_color']
+        ).pack(anchor='w')
+        
         # 버튼 프레임
         button_frame = Frame(main_frame, bg=self.style['bg_color'])
         button_frame.pack(fill='x', pady=(0, 10))
@@ -128,8 +151,8 @@ class DanawaImageDownloader:
         button_container = Frame(button_frame, bg=self.style['bg_color'])
         button_container.pack(expand=True)
         
-        # 다운로드 버튼
-        Button(
+        # 다운로드 버튼 (작업 중에는 비활성화)
+        self.download_button = Button(
             button_container,
             text="이미지 다운로드",
             command=self.start_download,
@@ -141,7 +164,8 @@ class DanawaImageDownloader:
             relief='flat',
             padx=20,
             pady=5
-        ).pack(side=LEFT, padx=(0, 5))
+        )
+        self.download_button.pack(side=LEFT, padx=(0, 5))
         
         # 폴더 열기 버튼
         Button(
@@ -183,6 +207,16 @@ class DanawaImageDownloader:
         )
         self.progress_label.pack(pady=(5, 0))
         
+        # 실시간 통계 레이블 (옵션을 켰을 때만 표시)
+        self.stats_label = Label(
+            progress_frame,
+            text="",
+            font=(self.style['font_family'], self.style['text_font_size'] - 1),
+            bg=self.style['bg_color'],
+            fg=self.style['text_color'],
+            wraplength=360
+        )
+        
         # 로그 출력 영역
         log_frame = Frame(main_frame, bg=self.style['bg_color'])
         log_frame.pack(fill='both', expand=True)
@@ -211,301 +245,121 @@ class DanawaImageDownloader:
         self.url_text.bind('<Button-4>', lambda e: self.url_text.yview_scroll(-1, "units"))
         self.url_text.bind('<Button-5>', lambda e: self.url_text.yview_scroll(1, "units"))
         
-        # 다운로드 폴더 생성
-        self.base_folder = "danawa_images"
-        os.makedirs(self.base_folder, exist_ok=True)
+        # 작업 스레드 → GUI 이벤트 큐 (root.after 로 일정 간격마다 처리)
+        self.event_queue = queue.Queue()
+        self.refresh_interval_ms = 50
+        self.stats_interval_ms = 1000
+        self.last_stats_update = 0
+        self.max_log_lines = 500
+        self.log_file = None
+        self.log_file_lock = threading.Lock()
         
-        # HTTP 세션 초기화
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        })
+        # 다운로드 엔진 초기화 (다운로드 폴더, HTTP 세션, 드라이버 풀, 캐시)
+        DanawaDownloader.__init__(self)
         
-        # Selenium 웹드라이버 초기화
-        self.driver = None
+        # 전체 로그는 파일에 기록 (화면에는 최근 max_log_lines 줄만 표시)
+        self.log_file = open(os.path.join(self.base_folder, "download.log"), "a", encoding="utf-8")
+        self.root.after(self.refresh_interval_ms, self.process_events)
         
-        # 마지막으로 다운로드한 상품 폴더 경로
-        self.last_download_folder = None
-        
-        # 다운로드 진행 상태
-        self.total_images = 0
-        self.downloaded_images = 0
+        # URL 입력을 시작하면 HTTP 세션과 Chrome 을 백그라운드에서 미리 준비
+        self.prewarm_browser = True
+        self.prewarm_started = False
+        for sequence in ('<FocusIn>', '<Key>', '<<Paste>>'):
+            self.url_text.bind(sequence, self.start_prewarm, add='+')
         
     def log(self, message):
-        """로그 메시지를 추가하고 자동으로 스크롤"""
-        self.log_text.insert(END, message + "\n")
-        self.log_text.see(END)
-        self.root.update_idletasks()
+        """로그 메시지를 이벤트 큐에 넣고 로그 파일에 기록 (어느 스레드에서나 호출 가능)"""
+        self.event_queue.put(('log', message))
+        with self.log_file_lock:
+            if self.log_file:
+                self.log_file.write(message + "\n")
+                self.log_file.flush()
         
-    def init_selenium(self):
-        if self.driver is None:
-            try:
-                self.log("ChromeDriver 버전 확인 중...")
-                
-                options = webdriver.ChromeOptions()
-                options.add_argument('--headless')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--blink-settings=imagesEnabled=false')
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-logging')
-                options.add_argument('--log-level=3')
-                options.add_argument('--silent')
-                options.add_argument('--disable-notifications')
-                options.add_argument('--disable-popup-blocking')
-                options.add_argument('--disable-infobars')
-                options.add_argument('--disable-web-security')
-                options.add_argument('--disable-features=IsolateOrigins,site-per-process')
-                
-                service = ChromeService(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=options)
-                self.driver.set_page_load_timeout(30)
-                
-                self.log("ChromeDriver 초기화 완료")
-                
-            except Exception as e:
-                self.log(f"ChromeDriver 초기화 오류: {str(e)}")
-                self.driver = None
-            
-    def close_selenium(self):
-        if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
-            finally:
-                self.driver = None
-            
-    def download_image_parallel(self, url, folder, filename):
-        try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code == 200:
-                filepath = os.path.join(folder, filename)
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                return True
-            return False
-        except Exception as e:
-            self.log(f"Error downloading {url}: {str(e)}")
-            return False
-            
-    def extract_pcode(self, text):
-        if text.isdigit():
-            return text
-        try:
-            query = urlparse(text).query
-            params = parse_qs(query)
-            pcode = params.get("pcode", [None])[0]
-            if pcode and pcode.isdigit():
-                return pcode
-        except:
-            pass
-        return None
+    def set_status(self, text, progress=None):
+        """진행 상태 레이블 갱신 요청"""
+        self.event_queue.put(('status', text, progress))
         
-    def is_direct_image_url(self, url):
-        return ('iws.danawa.com' in url or 'img.danawa.com' in url) and url.endswith('.jpg')
+    def update_progress(self, current, total):
+        """프로그레스 바 갱신 요청 (화면에는 프레임마다 마지막 값만 반영)"""
+        self.event_queue.put(('progress', current, total))
         
-    def get_product_images(self, pcode):
+    def process_events(self):
+        """GUI 스레드에서 쌓인 이벤트를 한 번에 반영"""
+        lines = []
+        label = None
         try:
-            # 대기 메시지 표시
-            self.progress_label.config(text="잠시만 기다려주세요... 이미지를 찾는 중입니다.")
-            self.root.update_idletasks()
-            
-            # 1. 썸네일 이미지 URL 생성
-            thumbnail_urls = []
-            for i in range(1, 6):
-                base_url = f"https://img.danawa.com/prod_img/500000/{pcode[-3:]}/{pcode[-6:-3]}/img/{pcode}_{i}.jpg"
-                thumbnail_urls.append({
-                    '500px': f"{base_url}?shrink=500",
-                    '890px': f"{base_url}?shrink=890",
-                    'original': base_url
-                })
-                self.log(f"Generated thumbnail URL: {base_url}")
+            while True:
+                event = self.event_queue.get_nowait()
+                if event[0] == 'log':
+                    lines.append(event[1])
+                elif event[0] == 'finished':
+                    self.download_button.config(state='normal')
+                else:
+                    label = event
+        except queue.Empty:
+            pass
             
-            # 2. 상세페이지 이미지 URL 생성
-            self.init_selenium()
-            if not self.driver:
-                return thumbnail_urls
-                
-            url = f"https://prod.danawa.com/info/?pcode={pcode}"
-            self.driver.get(url)
+        if lines:
+            self.log_text.insert(END, "\n".join(lines) + "\n")
+            # 최근 max_log_lines 줄만 남기기
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > self.max_log_lines:
+                self.log_text.delete("1.0", f"{line_count - self.max_log_lines + 1}.0")
+            self.log_text.see(END)
             
-            # "상품정보 더보기" 버튼 클릭
+        if label and label[0] == 'status':
+            _, text, progress = label
+            if progress is not None:
+                self.progress_var.set(progress)
+            self.progress_label.config(text=text)
+        elif label and label[0] == 'progress':
+            _, current, total = label
             try:
-                more_button = WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "button.btn_more"))
-                )
-                more_button.click()
-                self.log("Clicked '상품정보 더보기' button")
-                
-                # 추가 콘텐츠가 로드될 때까지 대기
-                WebDriverWait(self.driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".detail_cont"))
-                )
-            except TimeoutException:
-                self.log("No '상품정보 더보기' button found or timeout")
-            
-            # 페이지 소스 가져오기
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # 상세페이지에서 이미지 찾기
-            detail_images = soup.select('.detail_cont img, .detail_cont a img, .prod_detail img, .prod_detail a img, .detail_cont div img, .prod_detail div img')
-            self.log(f"Found {len(detail_images)} detail images")
-            
-            detail_urls = []
-            for img in detail_images:
-                src = img.get('src', '') or img.get('data-src', '')
-                if src and ('add_1' in src or 'prod_img' in src):
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        src = 'https://prod.danawa.com' + src
-                        
-                    if src.endswith('.jpg'):
-                        base_url = src.split('?')[0]
-                        detail_urls.append({
-                            '500px': f"{base_url}?shrink=500",
-                            '890px': f"{base_url}?shrink=890",
-                            'original': base_url
-                        })
-                        self.log(f"Found detail image URL: {base_url}")
-            
-            return thumbnail_urls + detail_urls
-            
-        except Exception as e:
-            self.log(f"Error fetching images from page: {str(e)}")
-            return thumbnail_urls
-        finally:
-            self.close_selenium()
-            # 대기 메시지 초기화
-            self.progress_label.config(text="")
-            self.root.update_idletasks()
-            
-    def process_direct_image_url(self, url):
-        try:
-            # Extract pcode from URL if possible
-            pcode = None
-            if '/prod_' in url:
-                pcode_match = re.search(r'/prod_(\d+)/', url)
-                if pcode_match:
-                    pcode = pcode_match.group(1)
-            
-            # Create folder
-            if pcode:
-                product_folder = os.path.join(self.base_folder, pcode)
-            else:
-                product_folder = os.path.join(self.base_folder, "direct")
-            os.makedirs(product_folder, exist_ok=True)
-            
-            # Get base URL without parameters
-            base_url = url.split('?')[0]
-            
-            # Download both sizes
-            filename = os.path.basename(base_url)
-            filename_500 = f"{os.path.splitext(filename)[0]}_500px.jpg"
-            filename_890 = f"{os.path.splitext(filename)[0]}_890px.jpg"
-            
-            if self.download_image_parallel(f"{base_url}?shrink=500", product_folder, filename_500):
-                self.log(f"Downloaded 500px version of {filename}")
-            
-            if self.download_image_parallel(f"{base_url}?shrink=890", product_folder, filename_890):
-                self.log(f"Downloaded 890px version of {filename}")
+                progress = min((current / total) * 100, 100)
+                megabytes = self.downloaded_bytes / (1024 * 1024)
+                self.progress_var.set(progress)
+                self.progress_label.config(text=f"다운로드 중... {current}/{total} ({progress:.1f}%) · {megabytes:.1f} MB")
+            except:
+                pass
                 
-        except Exception as e:
-            self.log(f"Error processing direct image URL: {e}")
+        # 통계는 1초에 한 번만 갱신
+        now = time.monotonic()
+        if self.show_stats_var.get() and (now - self.last_stats_update) * 1000 >= self.stats_interval_ms:
+            self.last_stats_update = now
+            self.stats_label.config(text=self.metrics.live_text())
             
-    def update_progress(self, current, total):
-        """프로그레스 바 업데이트"""
-        try:
-            progress = min((current / total) * 100, 100)
-            self.progress_var.set(progress)
-            self.progress_label.config(text=f"다운로드 중... {current}/{total} ({progress:.1f}%)")
-            self.root.update_idletasks()
-        except:
-            pass
+        self.root.after(self.refresh_interval_ms, self.process_events)
         
-    def process_url(self, url):
-        url = url.strip()
-        if not url:
-            return
+    def start_prewarm(self, event=None):
+        """처음 한 번만 엔진 미리 준비 시작"""
+        if not self.prewarm_started:
+            self.prewarm_started = True
+            self.prewarm(browser=self.prewarm_browser)
             
-        if self.is_direct_image_url(url):
-            self.log(f"\nProcessing direct image URL: {url}")
-            self.process_direct_image_url(url)
-            return
+    def toggle_stats(self):
+        """실시간 통계 레이블 표시/숨기기"""
+        if self.show_stats_var.get():
+            self.last_stats_update = 0
+            self.stats_label.pack(pady=(2, 0))
+        else:
+            self.stats_label.pack_forget()
             
-        pcode = self.extract_pcode(url)
-        if not pcode:
-            self.log(f"Invalid URL: {url}")
-            return
-            
-        self.log(f"\nProcessing product code: {pcode}")
-        
-        # Create folder for this product
-        product_folder = os.path.join(self.base_folder, pcode)
-        os.makedirs(product_folder, exist_ok=True)
-        
-        # 마지막 다운로드 폴더 업데이트
-        self.last_download_folder = product_folder
-        
-        # Get and download images
-        images = self.get_product_images(pcode)
-        if not images:
-            self.log(f"No images found for product {pcode}")
-            return
-            
-        self.log(f"Found {len(images)} images")
-        
-        # 다운로드 진행 상태 초기화
-        self.total_images = len(images)
-        self.downloaded_images = 0
-        self.update_progress(0, self.total_images)
-        
-        # 썸네일 이미지 다운로드 (1-5)
-        for i in range(5):  # 0부터 4까지 (5개 이미지)
-            if i < len(images):
-                filename = f"image_{i+1}_500px.jpg"
-                if self.download_image_parallel(images[i]['500px'], product_folder, filename):
-                    self.log(f"Downloaded thumbnail image {i+1}")
-                else:
-                    self.log(f"Failed to download thumbnail image {i+1}")
-                self.downloaded_images += 1
-                self.update_progress(self.downloaded_images, self.total_images)
-        
-        # 상세페이지 이미지 다운로드
-        if len(images) > 5:  # 6번째 이미지부터는 상세페이지 이미지
-            detail_images = images[5:]  # 6번째 이미지부터는 상세페이지 이미지
-            for i, img in enumerate(detail_images, 1):
-                filename = f"상세페이지_{i}.jpg"
-                if self.download_image_parallel(img['original'], product_folder, filename):
-                    self.log(f"Downloaded detail page image {i}")
-                else:
-                    self.log(f"Failed to download detail page image {i}")
-                self.downloaded_images += 1
-                self.update_progress(self.downloaded_images, self.total_images)
-        
-        # 다운로드 완료
-        self.progress_var.set(100)  # 확실하게 100%로 설정
-        self.progress_label.config(text="다운로드 완료!")
-        self.root.update_idletasks()
-        
     def start_download(self):
         urls = self.url_text.get("1.0", END).strip().split("\n")
         self.log_text.delete("1.0", END)
         self.log("Starting download process...")
+        self.force_refresh = self.force_refresh_var.get()
+        # 같은 엔진으로 배치가 겹쳐 실행되지 않도록 끝날 때까지 버튼 비활성화
+        self.download_button.config(state='disabled')
         
         # Process URLs in a separate thread to keep GUI responsive
         def download_thread():
             try:
-                for url in urls:
-                    if url.strip():
-                        self.process_url(url)
-                self.log("\nDownload process completed!")
+                self.download(urls)
+            except Exception as e:
+                self.log(f"Error during download: {str(e)}")
             finally:
-                self.close_selenium()
-                self.session.close()
+                self.event_queue.put(('finished',))
             
         threading.Thread(target=download_thread, daemon=True).start()
         
@@ -531,9 +385,13 @@ class DanawaImageDownloader:
         try:
             self.root.mainloop()
         finally:
-            self.close_selenium()
-            self.session.close()
+            self.close()
+            with self.log_file_lock:
+                self.log_file.close()
+                self.log_file = None
 
 if __name__ == "__main__":
+    # PyInstaller 실행 파일에서 이미지 변환용 프로세스 풀을 쓰기 위해 필요
+    multiprocessing.freeze_support()
     app = DanawaImageDownloader()
     app.run() 
\ No newline at end of file
@@ -0,0 +1,236 @@
+import os
+import csv
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+
+# 보고서 CSV 에 상품별로 넣을 단계 (실행 순서대로)
+REPORT_STAGES = (
+    'resolve', 'page_fetch', 'resolver_http', 'resolver_selenium',
+    'driver_acquire', 'page_load', 'page_ready', 'download', 'image', 'transfer', 'derive'
+)
+
+
+def percentile(values, fraction):
+    """정렬된 값 목록에서 백분위 값 (nearest-rank)"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class BatchMetrics:
+    """배치 하나의 단계별 소요 시간과 카운터 집계
+
+    span() 으로 단계 소요 시간을, count() 로 요청 수/바이트/캐시 적중 같은
+    카운터를 기록한다. key 를 주면 상품(pcode 또는 폴더 이름)별로도 모은다.
+    여러 작업 스레드에서 동시에 호출해도 된다.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.finished = None
+            self.durations = {}
+            self.counters = {}
+            self.products = {}
+
+    def finish(self):
+        self.finished = time.time()
+
+    def product(self, key):
+        if key not in self.products:
+            self.products[key] = {'stages': {}, 'counters': {}}
+        return self.products[key]
+
+    @contextmanager
+    def span(self, stage, key=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, key)
+
+    def record(self, stage, seconds, key=None):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            if key is not None:
+                stages = self.product(key)['stages']
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def count(self, name, value=1, key=None):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if key is not None:
+                counters = self.product(key)['counters']
+                counters[name] = counters.get(name, 0) + value
+
+    def state(self):
+        """다른 프로세스로 보낼 수 있는 원본 기록 (merge() 로 합침)"""
+        with self.lock:
+            return {
+                'durations': {stage: list(values) for stage, values in self.durations.items()},
+                'counters': dict(self.counters),
+                'products': {key: {'stages': dict(value['stages']), 'counters': dict(value['counters'])}
+                             for key, value in self.products.items()}
+            }
+
+    def merge(self, state):
+        """작업 프로세스의 state() 를 이 집계에 더함"""
+        with self.lock:
+            for stage, values in state['durations'].items():
+                self.durations.setdefault(stage, []).extend(values)
+            for name, value in state['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for key, value in state['products'].items():
+                product = self.product(key)
+                for stage, seconds in value['stages'].items():
+                    product['stages'][stage] = product['stages'].get(stage, 0.0) + seconds
+                for name, count in value['counters'].items():
+                    product['counters'][name] = product['counters'].get(name, 0) + count
+
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    def hit_rates(self, counters):
+        """<이름>_hit / <이름>_miss 카운터 쌍의 적중률"""
+        rates = {}
+        caches = {name.rsplit('_', 1)[0] for name in counters if name.endswith(('_hit', '_miss'))}
+        for cache in caches:
+            hits = counters.get(cache + '_hit', 0)
+            total = hits + counters.get(cache + '_miss', 0)
+            rates[cache] = hits / total if total else None
+        return rates
+
+    def summary(self):
+        """배치 전체 집계 (단계별 횟수/합계/p50/p95/최대, 카운터, 캐시 적중률)"""
+        with self.lock:
+            durations = {stage: sorted(values) for stage, values in self.durations.items()}
+            counters = dict(self.counters)
+        elapsed = self.elapsed()
+        stages = {}
+        for stage, values in durations.items():
+            stages[stage] = {
+                'count': len(values),
+                'total': sum(values),
+                'p50': percentile(values, 0.50),
+                'p95': percentile(values, 0.95),
+                'max': values[-1]
+            }
+        return {
+            'started': self.started,
+            'elapsed': elapsed,
+            'stages': stages,
+            'counters': counters,
+            'hit_rates': self.hit_rates(counters),
+            'bytes_per_sec': counters.get('bytes', 0) / elapsed if elapsed else 0.0,
+            'requests_per_sec': counters.get('requests', 0) / elapsed if elapsed else 0.0
+        }
+
+    def product_rows(self, results):
+        """결과 목록에 상품별 단계 시간과 카운터를 붙인 행 목록"""
+        with self.lock:
+            products = {key: {'stages': dict(value['stages']), 'counters': dict(value['counters'])}
+                        for key, value in self.products.items()}
+        rows = []
+        for result in results:
+            key = result.get('pcode') or (os.path.basename(result['folder']) if result.get('folder') else None)
+            metrics = products.get(key, {'stages': {}, 'counters': {}})
+            rows.append({
+                'input': result['input'],
+                'pcode': result.get('pcode'),
+                'downloaded': len(result['downloaded']),
+                'failed': len(result['failed']),
+                'error': result.get('error'),
+                'stages': metrics['stages'],
+                'counters': metrics['counters']
+            })
+        return rows
+
+    def live_text(self):
+        """GUI 실시간 통계용 한 줄 요약"""
+        with self.lock:
+            counters = dict(self.counters)
+            products = len(self.durations.get('download', []))
+        elapsed = self.elapsed()
+        rate = counters.get('bytes', 0) / elapsed / (1024 * 1024) if elapsed else 0.0
+        text = (
+            f"상품 {products} · 이미지 {counters.get('images', 0)} · "
+            f"요청 {counters.get('requests', 0)} (실패 {counters.get('request_errors', 0)}) · {rate:.1f} MB/s"
+        )
+        hits = sum(value for name, value in counters.items() if name.endswith('_hit'))
+        misses = sum(value for name, value in counters.items() if name.endswith('_miss'))
+        if hits + misses:
+            text += f" · 캐시 {hits / (hits + misses) * 100:.0f}%"
+        return text
+
+    def write_report(self, folder, results):
+        """batch_<시각>.json (상품별 + 전체) 과 batch_<시각>.csv (상품별) 를 쓰고 경로를 반환"""
+        os.makedirs(folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started))
+        json_path = os.path.join(folder, f"batch_{stamp}.json")
+        csv_path = os.path.join(folder, f"batch_{stamp}.csv")
+        rows = self.product_rows(results)
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({'summary': self.summary(), 'products': rows}, f, ensure_ascii=False, indent=2)
+
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(
+                ['input', 'pcode', 'downloaded', 'failed', 'error', 'bytes', 'requests']
+                + [f"{stage}_seconds" for stage in REPORT_STAGES]
+            )
+            for row in rows:
+                writer.writerow(
+                    [row['input'], row['pcode'] or '', row['downloaded'], row['failed'], row['error'] or '',
+                     row['counters'].get('bytes', 0), row['counters'].get('requests', 0)]
+                    + [f"{row['stages'][stage]:.3f}" if stage in row['stages'] else '' for stage in REPORT_STAGES]
+                )
+        return json_path, csv_path
+
+    def prometheus_text(self, prefix="danawa"):
+        """Prometheus 텍스트 형식 (node_exporter textfile collector 용)"""
+        summary = self.summary()
+        lines = [
+            f"# HELP {prefix}_batch_duration_seconds Duration of the last batch.",
+            f"# TYPE {prefix}_batch_duration_seconds gauge",
+            f"{prefix}_batch_duration_seconds {summary['elapsed']:.6f}",
+            f"# HELP {prefix}_batch_timestamp_seconds Start time of the last batch.",
+            f"# TYPE {prefix}_batch_timestamp_seconds gauge",
+            f"{prefix}_batch_timestamp_seconds {summary['started']:.3f}"
+        ]
+        for name, value in sorted(summary['counters'].items()):
+            lines += [
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total {value}"
+            ]
+        if summary['hit_rates']:
+            lines.append(f"# TYPE {prefix}_cache_hit_ratio gauge")
+            for cache, rate in sorted(summary['hit_rates'].items()):
+                if rate is not None:
+                    lines.append(f'{prefix}_cache_hit_ratio{{cache="{cache}"}} {rate:.6f}')
+        if summary['stages']:
+            lines.append(f"# TYPE {prefix}_stage_seconds summary")
+            for stage, values in sorted(summary['stages'].items()):
+                lines += [
+                    f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.5"}} {values["p50"]:.6f}',
+                    f'{prefix}_stage_seconds{{stage="{stage}",quantile="0.95"}} {values["p95"]:.6f}',
+                    f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {values["total"]:.6f}',
+                    f'{prefix}_stage_seconds_count{{stage="{stage}"}} {values["count"]}'
+                ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix="danawa"):
+        """textfile collector 가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text(prefix))
+        os.replace(temp_path, path)
@@ -0,0 +1,223 @@
+import os
+import time
+import queue
+import multiprocessing
+
+from danawa_core import BatchJournal
+
+
+# 작업 프로세스에 그대로 복사할 엔진 설정
+SHARD_SETTINGS = (
+    'product_base_url', 'image_base_url', 'detail_content_path',
+    'host_limits', 'host_rates', 'default_host_rate',
+    'max_retries', 'retry_base_delay', 'retry_max_delay',
+    'variant_policy', 'derive_variants', 'resize_quality',
+    'default_thumbnails', 'max_thumbnails',
+    'incremental', 'revalidate', 'chunk_size', 'max_image_bytes', 'dedup',
+    'html_parser', 'page_quiet_ms', 'page_ready_timeout',
+    'chromedriver_path', 'force_refresh',
+    'output', 'archive_scope', 'archive_spool_size', 'current_archive_name'
+)
+
+
+def shard_settings(downloader, processes):
+    """작업 프로세스용 생성자 인자와 설정
+
+    호스트별 동시 요청 수는 download_sharded 가 만드는 공유 세마포어로 전체
+    프로세스에 걸쳐 제한하고, 초당 요청 수는 프로세스 수로 나눠서 전체
+    요청량이 단일 프로세스와 같게 한다.
+    """
+    options = {
+        'base_folder': downloader.base_folder,
+        'max_workers': downloader.max_workers,
+        'driver_pool_size': downloader.driver_pool_size,
+        'transport': downloader.transport,
+        'cache_ttl': downloader.cache_ttl,
+        'cache_max_entries': downloader.cache_max_entries,
+        'negative_cache_ttl': downloader.negative_cache_ttl
+    }
+    settings = {name: getattr(downloader, name) for name in SHARD_SETTINGS}
+    settings['host_rates'] = {host: rate / processes for host, rate in downloader.host_rates.items()}
+    settings['default_host_rate'] = downloader.default_host_rate / processes
+    # 바운드 메서드는 다른 프로세스로 넘길 수 없으므로 리졸버 이름만 전달
+    settings['detail_resolver_names'] = [name for name, _ in downloader.detail_resolvers]
+    return options, settings
+
+
+def shard_worker(shard, options, settings, host_slots, work_queue, event_queue):
+    """작업 프로세스: 공유 큐에서 입력을 하나씩 꺼내 process_url 로 처리
+
+    세션, 드라이버 풀, 캐시 연결은 프로세스마다 따로 만든다. 로그와 진행
+    상황은 event_queue 로 보내고, 큐가 비면 재시도까지 마친 뒤 결과와
+    지표를 한 번에 보낸다.
+    """
+    from danawa_core import DanawaDownloader
+
+    downloader = DanawaDownloader(**options)
+    resolver_names = settings.pop('detail_resolver_names')
+    for name, value in settings.items():
+        setattr(downloader, name, value)
+    downloader.detail_resolvers = [
+        (name, resolver) for name, resolver in downloader.detail_resolvers if name in resolver_names
+    ]
+    downloader.host_slots = host_slots
+    downloader.log = lambda message: event_queue.put(('log', shard, message))
+    # 배치 아카이브는 프로세스마다 따로 쓴다 (<이름>_shard<번호>)
+    downloader.current_archive_name = f"{downloader.current_archive_name}_shard{shard}"
+
+    results = []
+    deferred = []
+    try:
+        while True:
+            url = work_queue.get()
+            if url is None:
+                break
+            event_queue.put(('start', shard, url))
+            try:
+                result = downloader.process_url(url)
+                if result is None:
+                    result = downloader.build_result(url, None, None, error="invalid input")
+            except Exception as e:
+                downloader.log(f"Error processing {url.strip()}: {str(e)}")
+                result = downloader.build_result(url, None, None, error=str(e))
+            results.append(result)
+            # 재시도가 남은 입력은 재시도가 끝난 뒤 finished 이벤트로 저널에 기록
+            complete = downloader.is_complete(result)
+            if not complete:
+                deferred.append(url)
+            event_queue.put(('done', shard, url, complete))
+
+        downloader.run_retries(results)
+        downloader.close_archives()
+        downloader.metrics.finish()
+        event_queue.put(('finished', shard, results, downloader.metrics.state(), dict(downloader.resolver_counts), deferred))
+    finally:
+        downloader.close()
+
+
+def download_sharded(downloader, urls, processes=None):
+    """입력 목록을 여러 프로세스로 나눠 처리하고 합친 결과 목록을 반환
+
+    입력은 공유 작업 큐로 나눠 주므로 빨리 끝난 프로세스가 더 많이 가져간다.
+    같은 상품 번호는 한 번만 처리하고, 완료된 입력은 batch_journal.jsonl 에
+    기록해서 중단 후 다시 실행하면 남은 항목만 처리한다. 재시도가 남은 입력은
+    작업 프로세스가 재시도를 마친 뒤에 기록한다. 프로세스가 비정상 종료되면
+    처리 중이던 입력은 오류로 기록되고 저널에는 남지 않는다.
+    """
+    processes = processes or os.cpu_count() or 1
+    downloader.metrics.reset()
+    downloader.current_archive_name = downloader.archive_name or time.strftime("batch_%Y%m%d_%H%M%S")
+    downloader.resolver_counts = {}
+
+    journal = BatchJournal(os.path.join(downloader.base_folder, "batch_journal.jsonl"))
+    done = journal.start(urls)
+    if done:
+        downloader.log(f"Resuming previous batch: {len(done)} entries already completed")
+
+    # 같은 상품을 가리키는 입력은 한 번만 처리
+    pending = []
+    seen = set()
+    for url in urls:
+        url = url.strip()
+        if not url or url in done:
+            continue
+        key = url if downloader.is_direct_image_url(url) else (downloader.extract_pcode(url) or url)
+        if key in seen:
+            downloader.log(f"Skipping duplicate input: {url}")
+            continue
+        seen.add(key)
+        pending.append(url)
+
+    results = []
+    if not pending:
+        journal.finish()
+        downloader.write_run_report(results)
+        return results
+
+    processes = min(processes, len(pending))
+    options, settings = shard_settings(downloader, processes)
+    # Windows 와 같은 방식으로 동작하도록 spawn 사용 (부모의 스레드/세션을 복제하지 않음)
+    # 작업 프로세스는 --derive 의 크기 변환 프로세스 풀을 띄울 수 있도록 데몬이 아니다
+    # (종료 시 아래 finally 에서 join 후 남아 있으면 terminate)
+    context = multiprocessing.get_context("spawn")
+    # 호스트별 동시 요청 수는 모든 프로세스가 하나의 세마포어를 나눠 쓴다
+    host_slots = {host: context.BoundedSemaphore(limit) for host, limit in downloader.host_limits.items()}
+    work_queue = context.Queue()
+    event_queue = context.Queue()
+    for url in pending:
+        work_queue.put(url)
+    for _ in range(processes):
+        work_queue.put(None)
+
+    workers = {}
+    for shard in range(processes):
+        worker = context.Process(
+            target=shard_worker,
+            args=(shard, options, dict(settings), host_slots, work_queue, event_queue)
+        )
+        worker.start()
+        workers[shard] = worker
+    downloader.log(f"Started {processes} worker processes for {len(pending)} entries")
+
+    in_flight = {shard: set() for shard in workers}
+    finished = set()
+    completed = 0
+    clean = True
+    try:
+        while len(finished) < len(workers):
+            try:
+                event = event_queue.get(timeout=0.5)
+            except queue.Empty:
+                # 결과를 보내지 못하고 종료된 프로세스 확인
+                for shard, worker in workers.items():
+                    if shard not in finished and not worker.is_alive():
+                        finished.add(shard)
+                        clean = False
+                        downloader.log(f"[shard {shard}] exited unexpectedly (exit code {worker.exitcode})")
+                        for url in in_flight[shard]:
+                            results.append(downloader.build_result(url, None, None, error="worker process exited"))
+                continue
+
+            kind, shard = event[0], event[1]
+            if kind == 'log':
+                # 빈 줄로 시작하는 메시지는 빈 줄을 접두어 앞에 둔다
+                message = event[2]
+                blank = "\n" if message.startswith("\n") else ""
+                downloader.log(f"{blank}[shard {shard}] {message.lstrip()}")
+            elif kind == 'start':
+                in_flight[shard].add(event[2])
+            elif kind == 'done':
+                in_flight[shard].discard(event[2])
+                if event[3]:
+                    journal.mark_done(event[2])
+                completed += 1
+                downloader.update_progress(completed, len(pending))
+            elif kind == 'finished':
+                _, _, shard_results, state, resolver_counts, deferred = event
+                results.extend(shard_results)
+                for url in deferred:
+                    journal.mark_done(url)
+                downloader.metrics.merge(state)
+                for name, count in resolver_counts.items():
+                    downloader.record_resolver(name, count)
+                finished.add(shard)
+    finally:
+        for worker in workers.values():
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+    if clean:
+        journal.finish()
+    downloader.metrics.finish()
+
+    downloaded = sum(len(result['downloaded']) for result in results)
+    failed = sum(len(result['failed']) for result in results)
+    errors = sum(1 for result in results if result['error'])
+    downloader.log("\nDownload process completed!")
+    downloader.log(f"Shards: {processes}, entries: {len(results)}, images: {downloaded}, failed images: {failed}, errors: {errors}")
+    if downloader.resolver_counts:
+        summary = ", ".join(f"{name}={count}" for name, count in sorted(downloader.resolver_counts.items()))
+        downloader.log(f"Detail resolvers: {summary}")
+    downloader.write_run_report(results)
+    return results
@@ -0,0 +1,101 @@
+def create_session(transport="requests", pool_size=10, pool_hosts=10):
+    """이미지 다운로드용 HTTP 세션 생성
+
+    transport 가 "requests" 이면 호스트마다 pool_size 개의 keep-alive 연결을
+    유지하는 requests.Session 을, "httpx" 이면 HTTP/2 로 요청을 다중화하는
+    httpx 클라이언트를 같은 인터페이스로 감싸서 반환한다. 재시도는 엔진의
+    재시도 스케줄러가 담당하므로 어댑터 수준 재시도는 끈다.
+    """
+    if transport == "httpx":
+        return HttpxSession(pool_size)
+    if transport != "requests":
+        raise ValueError(f"unknown transport: {transport}")
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HttpxResponse:
+    """httpx 응답을 requests.Response 처럼 쓰기 위한 래퍼"""
+
+    def __init__(self, response):
+        self.response = response
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+    @property
+    def headers(self):
+        return self.response.headers
+
+    @property
+    def text(self):
+        self.response.read()
+        return self.response.text
+
+    @property
+    def content(self):
+        return self.response.read()
+
+    def iter_content(self, chunk_size=None):
+        import httpx
+        import requests
+        try:
+            yield from self.response.iter_bytes(chunk_size)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e))
+        except httpx.DecodingError as e:
+            raise requests.exceptions.ContentDecodingError(str(e))
+
+    def close(self):
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class HttpxSession:
+    """httpx.Client 를 requests.Session 처럼 쓰기 위한 래퍼 (HTTP/2 지원)
+
+    httpx 와 h2 패키지가 필요하다 (pip install "httpx[http2]").
+    전송 오류는 엔진이 처리할 수 있도록 requests 예외로 바꿔서 올린다.
+    """
+
+    def __init__(self, pool_size=10, http2=True):
+        import httpx
+        self.client = httpx.Client(
+            http2=http2,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    @property
+    def headers(self):
+        return self.client.headers
+
+    def get(self, url, headers=None, timeout=10, stream=False):
+        import httpx
+        import requests
+        try:
+            request = self.client.build_request("GET", url, headers=headers, timeout=timeout)
+            response = self.client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e))
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e))
+        return HttpxResponse(response)
+
+    def close(self):
+        self.client.close()